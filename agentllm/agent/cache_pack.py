@@ -0,0 +1,257 @@
+"""Packed, indexed page cache and the offline tool that migrates data/cache into it.
+
+    python -m agent.cache_pack --src data/cache --dest data/pack [--workers N] [--prune]
+
+The tool walks the loose ``https_*.txt`` files written by fetch_page_text,
+drops empty and boilerplate pages, stores each distinct body once in
+``pages.pack`` and indexes it in ``index.sqlite`` under the URL recovered
+from the file name. It is incremental and resumable: files already recorded
+with the same size and mtime are skipped, so it can be interrupted and
+re-run at any time, including against a live cache.
+
+The service keeps reading the loose files until CACHE_PACK_DIR points at the
+pack directory. After that switch, --prune deletes the migrated loose files.
+"""
+import os, sys, time, sqlite3, hashlib, argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+PACK_NAME = 'pages.pack'
+# Statuses whose loose file is safe to delete: its body is in the pack, or it had
+# none worth keeping. 'unreadable' files are left for a later run to retry.
+PRUNABLE = ('packed', 'duplicate', 'empty', 'boilerplate')
+INDEX_NAME = 'index.sqlite'
+MIN_PARAGRAPH_CHARS = 80  # a page without one paragraph this long is boilerplate
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS bodies (
+    hash TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    name TEXT NOT NULL,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS bodies_mtime ON bodies (mtime);
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    hash TEXT,
+    url TEXT
+);
+'''
+
+
+class CachePack:
+    """Read-only view of a pack directory, used by the service."""
+
+    def __init__(self, directory):
+        self.dir = Path(directory)
+        self.pack_path = str(self.dir / PACK_NAME)
+        self.index_path = self.dir / INDEX_NAME
+
+    def _connect(self):
+        return sqlite3.connect(f'file:{self.index_path}?mode=ro', uri=True, timeout=30)
+
+    def version(self):
+        """mtime of the index; it changes whenever a migration run commits."""
+        try:
+            return os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def pages(self):
+        """Yield (name, path, mtime, start, end, url) per distinct body, newest first."""
+        with closing(self._connect()) as conn:
+            for name, url, offset, length, mtime in conn.execute(
+                    'SELECT name, url, offset, length, mtime FROM bodies ORDER BY mtime DESC'):
+                yield name, self.pack_path, mtime, offset, offset + length, url
+
+    def has_file(self, name, mtime):
+        """True if the loose file ``name`` was migrated as it is now."""
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT mtime FROM files WHERE name = ?', (name,)).fetchone()
+        return row is not None and row[0] == mtime
+
+    def read(self, name):
+        """Body stored for the loose file ``name``, or None."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                'SELECT b.offset, b.length FROM files f JOIN bodies b ON b.hash = f.hash WHERE f.name = ?',
+                (name,),
+            ).fetchone()
+        if row is None:
+            return None
+        with open(self.pack_path, 'rb') as fh:
+            fh.seek(row[0])
+            return fh.read(row[1]).decode('utf-8').rstrip('\n')
+
+
+def open_pack(directory=None):
+    """The pack named by CACHE_PACK_DIR, or None while the service uses loose files."""
+    directory = directory or os.getenv('CACHE_PACK_DIR', '')
+    if directory and (Path(directory) / INDEX_NAME).exists():
+        return CachePack(directory)
+    return None
+
+
+def recover_url(name):
+    """Best-effort canonical URL for a fetch_page_text cache file name.
+
+    fetch_page_text turned both '://' and '/' into '_', so underscores in the
+    original path cannot be told apart from slashes; they come back as '/'.
+    """
+    stem = name[:-4] if name.endswith('.txt') else name
+    for scheme in ('https', 'http'):
+        if stem.startswith(scheme + '_'):
+            rest = stem[len(scheme) + 1:]
+            break
+    else:
+        return None
+    host, _, path = rest.partition('_')
+    if '.' not in host:
+        return None
+    parts = urlsplit(f"{scheme}://{host.lower()}/{path.replace('_', '/')}")
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not k.lower().startswith('utm_')])
+    return urlunsplit((scheme, parts.netloc, parts.path.rstrip('/'), query, ''))
+
+
+def _scan_file(path):
+    """Classify one cache file; runs in a worker process.
+
+    Returns (status, hash, body) where body is the normalized text as bytes.
+    """
+    try:
+        with open(path, 'rb') as fh:
+            text = fh.read().decode('utf-8')
+    except (OSError, UnicodeDecodeError):
+        return 'unreadable', None, None
+    paragraphs = [p.strip() for p in text.split('\n') if p.strip()]
+    if not paragraphs:
+        return 'empty', None, None
+    if not any(len(p) >= MIN_PARAGRAPH_CHARS for p in paragraphs):
+        return 'boilerplate', None, None
+    # Trailing newline keeps bodies line-separated inside the pack
+    body = ('\n'.join(paragraphs) + '\n').encode('utf-8')
+    return 'ok', hashlib.sha256(body).hexdigest(), body
+
+
+def _pending_files(src, conn):
+    """Stream (path, name, mtime, size) for files not yet migrated in their current state."""
+    with os.scandir(src) as it:
+        for entry in it:
+            if not entry.is_file() or not entry.name.endswith('.txt'):
+                continue
+            st = entry.stat()
+            row = conn.execute('SELECT mtime, size FROM files WHERE name = ?', (entry.name,)).fetchone()
+            if row is not None and row[0] == st.st_mtime and row[1] == st.st_size:
+                continue
+            yield entry.path, entry.name, st.st_mtime, st.st_size
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def migrate(src, dest, workers=None, batch_size=256):
+    """Migrate loose cache files from ``src`` into the pack in ``dest``; returns counts."""
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(dest / INDEX_NAME)
+    conn.executescript(SCHEMA)
+    stats = Counter()
+    started = time.time()
+    try:
+        # Drop anything an interrupted run wrote to the pack but never committed
+        end = conn.execute('SELECT COALESCE(MAX(offset + length), 0) FROM bodies').fetchone()[0]
+        with open(dest / PACK_NAME, 'ab') as pack, ProcessPoolExecutor(workers) as pool:
+            pack.truncate(end)
+            pack.seek(0, os.SEEK_END)
+            for batch in _batches(_pending_files(src, conn), batch_size):
+                results = pool.map(_scan_file, [path for path, _, _, _ in batch], chunksize=16)
+                for (path, name, mtime, size), (status, digest, body) in zip(batch, results):
+                    stats['scanned'] += 1
+                    url = recover_url(name)
+                    if status == 'ok':
+                        row = conn.execute('SELECT mtime FROM bodies WHERE hash = ?', (digest,)).fetchone()
+                        if row is None:
+                            conn.execute(
+                                'INSERT INTO bodies (hash, offset, length, mtime, name, url) VALUES (?, ?, ?, ?, ?, ?)',
+                                (digest, pack.tell(), len(body), mtime, name, url),
+                            )
+                            pack.write(body)
+                            status = 'packed'
+                        else:
+                            # Same text under another URL: keep one body, listed under its newest name
+                            if mtime > row[0]:
+                                conn.execute('UPDATE bodies SET mtime = ?, name = ?, url = ? WHERE hash = ?',
+                                             (mtime, name, url, digest))
+                            status = 'duplicate'
+                    stats[status] += 1
+                    conn.execute(
+                        'INSERT OR REPLACE INTO files (name, mtime, size, status, hash, url) VALUES (?, ?, ?, ?, ?, ?)',
+                        (name, mtime, size, status, digest, url),
+                    )
+                pack.flush()
+                os.fsync(pack.fileno())
+                conn.commit()
+                rate = stats['scanned'] / max(time.time() - started, 1e-6)
+                print(f"  {stats['scanned']} files ({rate:.0f}/s): {stats['packed']} packed, "
+                      f"{stats['duplicate']} duplicate, {stats['empty']} empty, "
+                      f"{stats['boilerplate']} boilerplate, {stats['unreadable']} unreadable", flush=True)
+    finally:
+        conn.close()
+    return stats
+
+
+def prune(src, dest):
+    """Delete loose files whose current state is recorded in the pack index as PRUNABLE."""
+    removed = 0
+    with closing(sqlite3.connect(Path(dest) / INDEX_NAME)) as conn:
+        rows = conn.execute('SELECT name, mtime, size FROM files WHERE status IN (%s)'
+                            % ', '.join('?' * len(PRUNABLE)), PRUNABLE)
+        for name, mtime, size in rows:
+            path = os.path.join(src, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if st.st_mtime == mtime and st.st_size == size:
+                os.unlink(path)
+                removed += 1
+    return removed
+
+
+def main(argv=None):
+    base = Path(__file__).resolve().parent.parent / 'data'
+    parser = argparse.ArgumentParser(description='Compact data/cache into a packed, indexed page store.')
+    parser.add_argument('--src', default=os.getenv('CACHE_DIR', base / 'cache'), help='loose cache directory')
+    parser.add_argument('--dest', default=os.getenv('CACHE_PACK_DIR', base / 'pack'), help='pack directory')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=256, help='files per committed batch')
+    parser.add_argument('--prune', action='store_true',
+                        help='delete migrated loose files afterwards (only once the service reads the pack)')
+    args = parser.parse_args(argv)
+
+    print(f"Migrating {args.src} -> {args.dest}")
+    stats = migrate(args.src, args.dest, workers=args.workers, batch_size=args.batch_size)
+    print(f"Done: {stats['scanned']} files scanned, {stats['packed']} new bodies packed")
+    if args.prune:
+        print(f"Pruned {prune(args.src, args.dest)} loose files")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
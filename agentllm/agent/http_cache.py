@@ -0,0 +1,91 @@
+"""Conditional-GET and compression helpers for the read-only JSON endpoints."""
+import os, json, gzip, hashlib
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+MAX_AGE = int(os.getenv('HTTP_CACHE_MAX_AGE', '30'))
+STALE_WHILE_REVALIDATE = int(os.getenv('HTTP_CACHE_SWR', '60'))
+
+
+def negotiate_encoding(request: Request):
+    """Pick 'br', 'gzip' or None from the client's Accept-Encoding header."""
+    accepted = {}
+    for part in request.headers.get('accept-encoding', '').lower().split(','):
+        name, _, params = part.partition(';')
+        q = 1.0
+        for p in params.split(';'):
+            k, _, v = p.strip().partition('=')
+            if k == 'q':
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        if name.strip():
+            accepted[name.strip()] = q
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def make_etag(request: Request, *parts):
+    """Strong ETag for the representation identified by ``parts``.
+
+    The negotiated content coding is part of the tag, since gzip and brotli
+    bodies are different byte sequences.
+    """
+    key = '\x1f'.join(str(p) for p in parts + (negotiate_encoding(request) or 'identity',))
+    return '"%s"' % hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def cache_headers(etag):
+    return {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={MAX_AGE}, stale-while-revalidate={STALE_WHILE_REVALIDATE}',
+        'Vary': 'Accept-Encoding',
+    }
+
+
+def not_modified(request: Request, etag):
+    """Return a 304 response if If-None-Match matches ``etag``, else None."""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return None
+    # If-None-Match uses the weak comparison function (RFC 9110 13.1.2)
+    tags = {t.strip().replace('W/', '', 1) for t in header.split(',')}
+    if '*' in tags or etag in tags:
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
+
+
+def json_response(request: Request, payload, etag=None, cacheable=True):
+    """Serialize ``payload`` and compress it according to Accept-Encoding.
+
+    Without an ``etag`` the tag is derived from the serialized body, and a
+    matching If-None-Match gets a 304. ``cacheable=False`` sends the body with
+    ``Cache-Control: no-store`` and no ETag, for responses that must not be
+    reused, such as error fallbacks.
+    """
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if not cacheable:
+        headers = {'Cache-Control': 'no-store', 'Vary': 'Accept-Encoding'}
+    else:
+        if etag is None:
+            etag = make_etag(request, hashlib.sha1(body).hexdigest())
+            cached = not_modified(request, etag)
+            if cached is not None:
+                return cached
+        headers = cache_headers(etag)
+    encoding = negotiate_encoding(request)
+    if encoding == 'br':
+        body = brotli.compress(body, quality=5)
+        headers['Content-Encoding'] = 'br'
+    elif encoding == 'gzip':
+        body = gzip.compress(body, compresslevel=6)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(content=body, media_type='application/json', headers=headers)
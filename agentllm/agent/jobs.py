@@ -0,0 +1,214 @@
+"""Persistent background job queue backed by a local SQLite file.
+
+Jobs survive restarts and can be shared by several uvicorn worker processes
+pointing at the same database: claiming a job happens inside a
+``BEGIN IMMEDIATE`` transaction. While a handler runs, its worker keeps the
+job's lease fresh; a job whose lease runs out (its worker died mid-run) is
+handed to the next free worker, or failed once it has used all its attempts.
+"""
+import os, json, time, uuid, sqlite3, threading, traceback
+from contextlib import closing
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+JOB_DB_PATH = Path(os.getenv('JOB_DB_PATH', BASE_DIR / 'data' / 'jobs.sqlite'))
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    available_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, available_at);
+'''
+
+
+class JobQueue:
+    """SQLite job table served by a pool of worker threads.
+
+    ``handler(payload)`` runs in a worker thread and returns a JSON-serialisable
+    result. An exception counts as a failed attempt: the job is retried with
+    exponential backoff up to ``max_attempts`` times, then marked ``failed``.
+    A lost worker also uses up an attempt: its job is re-claimed once ``lease``
+    seconds pass without a heartbeat. Finished jobs are deleted ``result_ttl`` seconds after they complete.
+    """
+
+    def __init__(self, handler, path=JOB_DB_PATH, workers=2, max_attempts=3,
+                 result_ttl=3600, lease=300, poll_interval=1.0):
+        self.handler = handler
+        self.path = Path(path)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._last_purge = 0.0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def submit(self, payload):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, status, payload, created_at, updated_at, available_at) '
+                "VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, json.dumps(payload, ensure_ascii=False), now, now, now),
+            )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """Return the job as a dict, or None if unknown or expired."""
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        if row['status'] in ('done', 'failed') and row['updated_at'] < time.time() - self.result_ttl:
+            return None
+        job = {
+            'job_id': row['id'],
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+        if row['result'] is not None:
+            job['result'] = json.loads(row['result'])
+        if row['error']:
+            job['error'] = row['error']
+        return job
+
+    def start(self):
+        self._stopping.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wakeup.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _claim(self, conn):
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # A job that keeps killing its worker would otherwise be re-run forever
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+                "WHERE status = 'running' AND updated_at < ? AND attempts >= ?",
+                (f'Worker lost after {self.max_attempts} attempts', now, now - self.lease, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT id, payload, attempts FROM jobs "
+                "WHERE (status = 'queued' AND available_at <= ?) "
+                "   OR (status = 'running' AND updated_at < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now, now - self.lease),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (now, row['id']),
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def _finish(self, conn, job_id, attempts, result=None, error=None):
+        # Each update only applies while this attempt still owns the job
+        now = time.time()
+        if error is None:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, updated_at = ? "
+                "WHERE id = ? AND attempts = ?",
+                (json.dumps(result, ensure_ascii=False), now, job_id, attempts),
+            )
+        elif attempts < self.max_attempts:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, updated_at = ?, available_at = ? "
+                "WHERE id = ? AND attempts = ?",
+                (error, now, now + 2 ** attempts, job_id, attempts),
+            )
+        else:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ? AND attempts = ?",
+                (error, now, job_id, attempts),
+            )
+
+    def _heartbeat(self, job_id, attempts, done):
+        """Refresh the lease of a running job every ``lease / 3`` seconds until ``done`` is set."""
+        with closing(self._connect()) as conn:
+            while not done.wait(self.lease / 3):
+                try:
+                    conn.execute(
+                        "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = 'running' AND attempts = ?",
+                        (time.time(), job_id, attempts),
+                    )
+                except sqlite3.Error as e:
+                    print(f"✗ Job {job_id} heartbeat failed: {e}")
+
+    def _purge(self, conn):
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+            (now - self.result_ttl,),
+        )
+
+    def _work(self):
+        conn = self._connect()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    self._purge(conn)
+                    row = self._claim(conn)
+                except sqlite3.Error as e:
+                    print(f"✗ Job queue error: {e}")
+                    row = None
+                if row is None:
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+                    continue
+                attempts = row['attempts'] + 1
+                done = threading.Event()
+                heartbeat = threading.Thread(target=self._heartbeat, args=(row['id'], attempts, done),
+                                             name=f"job-heartbeat-{row['id']}", daemon=True)
+                heartbeat.start()
+                try:
+                    result = self.handler(json.loads(row['payload']))
+                    error = None
+                except Exception as e:
+                    print(f"✗ Job {row['id']} failed (attempt {attempts}/{self.max_attempts}): {e}")
+                    traceback.print_exc()
+                    result, error = None, str(e)
+                finally:
+                    done.set()
+                    heartbeat.join()
+                self._finish(conn, row['id'], attempts, result=result, error=error)
+        finally:
+            conn.close()
@@ -0,0 +1,55 @@
+"""Per-language routing for claim verification.
+
+The claim's script decides which sources are searched and how the query text
+is cleaned, so Devanagari claims do not pay for English-only sources and the
+open-web query (and vice versa).
+"""
+import re
+
+from agent.retrieval import load_sources_by_language
+
+# Devanagari block, used for Nepali
+_DEVANAGARI = re.compile(r'[ऀ-ॿ]')
+_LATIN = re.compile(r'[A-Za-z]')
+_DANDA = re.compile(r'[।॥]')  # । and ॥ only add noise to search queries
+
+SOURCES_BY_LANGUAGE = load_sources_by_language()
+
+ROUTES = {
+    'ne': {
+        # English-language pages rarely answer a Nepali claim, and the open web
+        # query returns mostly non-whitelisted hits, so only search the Nepali
+        # sources
+        'general_search': False,
+        'clean': lambda claim: ' '.join(_DANDA.sub(' ', claim).split()),
+    },
+    'en': {
+        'general_search': True,
+        'clean': lambda claim: ' '.join(claim.split()),
+    },
+}
+
+
+def detect_script(text):
+    """Return 'ne' for mostly-Devanagari text, 'en' for mostly-Latin text, else None."""
+    devanagari = len(_DEVANAGARI.findall(text))
+    latin = len(_LATIN.findall(text))
+    if not devanagari and not latin:
+        return None
+    return 'ne' if devanagari >= latin else 'en'
+
+
+def route_claim(claim, lang='ne'):
+    """Pick the language to verify ``claim`` in and its route.
+
+    The detected script wins over the requested ``lang`` when they disagree,
+    since clients default ``lang`` to 'ne' whatever the claim is written in.
+    Returns (lang, route) where route also carries the source ``domains``.
+    """
+    detected = detect_script(claim)
+    if detected and detected != lang:
+        print(f"  Language: requested '{lang}', claim script is '{detected}' - using '{detected}'")
+        lang = detected
+    route = dict(ROUTES.get(lang, ROUTES['en']))
+    route['domains'] = SOURCES_BY_LANGUAGE.get(lang, set()) | SOURCES_BY_LANGUAGE['*']
+    return lang, route
@@ -2,6 +2,9 @@ import os, requests, json, re
 
 GROQ_API_URL = 'https://api.groq.com/openai/v1/chat/completions'
 
+class LLMUpstreamError(RuntimeError):
+    """Groq could not be reached or answered with an error status."""
+
 SYSTEM_PROMPT = open(os.path.join(os.path.dirname(__file__), 'prompts', 'system_prompt.txt'), 'r', encoding='utf-8').read()
 CLASSIFY_PROMPT = open(os.path.join(os.path.dirname(__file__), 'prompts', 'classify_prompt.txt'), 'r', encoding='utf-8').read()
 
@@ -18,7 +21,9 @@ def build_messages(claim, evidence_items, lang='ne'):
     ]
     return messages
 
-def call_groq(claim, evidence_items, lang='ne', model=None):
+def call_groq(claim, evidence_items, lang='ne', model=None, raise_errors=False):
+    """Ask the LLM for a verdict. Upstream failures come back as UNCLEAR results,
+    or raise LLMUpstreamError when ``raise_errors`` is set so callers can retry."""
     GROQ_KEY = os.getenv('GROQ_API_KEY','')
     GROQ_MODEL = model or os.getenv('GROQ_MODEL', None)
     if not GROQ_KEY:
@@ -36,10 +41,14 @@ def call_groq(claim, evidence_items, lang='ne', model=None):
     try:
         r = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=30)
     except Exception as e:
+        if raise_errors:
+            raise LLMUpstreamError(f'Network error calling Groq: {e}') from e
         return {'verdict':'UNCLEAR','confidence':0,'explanation':f'Network error calling Groq: {e}','evidence': []}
 
     if r.status_code != 200:
         text = r.text
+        if raise_errors:
+            raise LLMUpstreamError(f'Groq API error: {r.status_code} {text}')
         return {'verdict':'UNCLEAR','confidence':0,'explanation':f'Groq API error: {r.status_code} {text}','evidence': []}
 
     data = r.json()
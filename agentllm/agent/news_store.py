@@ -0,0 +1,105 @@
+"""Compact in-memory records for the news listing.
+
+A Story keeps only what the listing needs. Article bodies stay in the cache
+file and are read back through mmap by byte range when a detail view asks for
+them, so a worker's memory no longer grows with the size of the cached pages.
+"""
+import sys, mmap
+
+
+class Story:
+    __slots__ = ('id', 'title', 'snippet', 'sources', 'published_at',
+                 'verification_status', 'source_url', 'views', 'path', 'start', 'end')
+
+    def __init__(self, id, title, snippet, sources, published_at, verification_status,
+                 source_url='', views=0, path=None, start=0, end=0):
+        self.id = id
+        self.title = title
+        self.snippet = snippet
+        # Source names repeat across thousands of stories, so share one copy
+        self.sources = tuple(sys.intern(s) for s in sources)
+        self.published_at = published_at
+        self.verification_status = sys.intern(verification_status)
+        self.source_url = source_url
+        self.views = views
+        self.path = path
+        self.start = start
+        self.end = end
+
+    @property
+    def source(self):
+        """Display name: the first two sources plus a count of the rest."""
+        label = ', '.join(self.sources[:2])
+        if len(self.sources) > 2:
+            label += f' +{len(self.sources) - 2} more'
+        return label
+
+    def add_source(self, name):
+        if name not in self.sources:
+            self.sources = self.sources + (sys.intern(name),)
+
+    @property
+    def full_text(self):
+        """Article body, loaded from the cache file on each access."""
+        if self.path is None:
+            return f"{self.title}\n\n{self.snippet}"
+        return read_paragraphs(self.path, self.start, self.end)
+
+
+def iter_paragraphs(path, limit, start=0, end=None):
+    """Yield (text, start, end) for the first ``limit`` non-empty lines of ``path``.
+
+    ``start``/``end`` are byte offsets, so the range can be handed back to
+    read_paragraphs later without keeping the text around. Only bytes in
+    [start, end) of the file are read, which lets one page of a pack be read.
+    """
+    if limit <= 0:
+        return
+    offset = start
+    count = 0
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        for raw in fh:
+            if end is not None:
+                if offset >= end:
+                    return
+                raw = raw[:end - offset]
+            line_start = offset
+            offset += len(raw)
+            line = raw.decode('utf-8').strip()
+            if line:
+                yield line, line_start, offset
+                count += 1
+                if count >= limit:
+                    return
+
+
+def read_paragraphs(path, start, end):
+    """Return the non-empty lines in bytes [start, end) of ``path``, joined by newlines."""
+    try:
+        with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            raw = mm[start:end]
+    except (OSError, ValueError):
+        return ''
+    text = raw.decode('utf-8', errors='replace')
+    return '\n'.join(p.strip() for p in text.split('\n') if p.strip())
+
+
+def file_mentions(path, words, needed):
+    """True if at least ``needed`` of ``words`` occur in ``path``.
+
+    Streams the file line by line and stops as soon as enough words are found.
+    """
+    if needed <= 0:
+        return True
+    remaining = set(words)
+    found = 0
+    with open(path, 'r', encoding='utf-8') as fh:
+        for line in fh:
+            hits = remaining.intersection(line.lower().split())
+            if hits:
+                remaining -= hits
+                found += len(hits)
+                if found >= needed:
+                    return True
+    return False
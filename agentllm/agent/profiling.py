@@ -0,0 +1,188 @@
+"""Opt-in profiling: per-request reports, a background stack sampler and tracemalloc.
+
+Everything here is off unless ADMIN_TOKEN is set (per-request profiles and
+tracemalloc) or PROFILE_SAMPLING=1 (the sampler).
+"""
+import os, io, sys, hmac, time, pstats, inspect, cProfile, functools, threading, contextvars, tracemalloc
+from collections import Counter
+
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+PROFILE_SAMPLING = os.getenv('PROFILE_SAMPLING', '') == '1'
+PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.1'))
+PROFILE_FLUSH_INTERVAL = float(os.getenv('PROFILE_FLUSH_INTERVAL', '60'))
+PROFILE_SAMPLE_PATH = os.getenv('PROFILE_SAMPLE_PATH', os.path.join(os.path.dirname(__file__), '..', 'data', 'profile.{pid}.folded'))
+
+_request_profile = contextvars.ContextVar('request_profile', default=None)
+
+
+def is_admin(request):
+    if not ADMIN_TOKEN:
+        return False
+    # compare_digest raises TypeError on non-ASCII str, so compare bytes. The
+    # server decoded the header as latin-1; encoding it back gives the bytes sent
+    try:
+        supplied = request.headers.get('x-admin-token', '').encode('latin-1')
+    except UnicodeEncodeError:
+        return False
+    return hmac.compare_digest(supplied, ADMIN_TOKEN.encode('utf-8'))
+
+
+class RequestProfile:
+    """Profile of one request; ``kind`` is 'cprofile' or 'pyinstrument'."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.report = None
+
+    def run(self, func, *args, **kwargs):
+        if self.kind == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:  # optional dependency, fall back to cProfile
+                self.kind = 'cprofile'
+            else:
+                profiler = Profiler(async_mode='disabled')
+                profiler.start()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profiler.stop()
+                    self.report = profiler.output_text(unicode=True, color=False)
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(60)
+            self.report = out.getvalue()
+
+
+def start_request_profile(kind):
+    """Activate a profile for the current request context; returns (profile, reset token)."""
+    profile = RequestProfile('pyinstrument' if kind == 'pyinstrument' else 'cprofile')
+    return profile, _request_profile.set(profile)
+
+
+def stop_request_profile(token):
+    _request_profile.reset(token)
+
+
+def profiled_endpoint(func):
+    """Wrap a sync endpoint so it runs under the request's profiler, if one is active.
+
+    Sync endpoints run in a threadpool thread, which a profiler started in the
+    middleware would not see, so the profiler is started here instead. The
+    active profile reaches this thread through a context variable.
+    """
+    if inspect.iscoroutinefunction(func):
+        return func  # async endpoints run on the event loop; not supported
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _request_profile.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        return profile.run(func, *args, **kwargs)
+    return wrapper
+
+
+# Leaf frames from these modules are idle threads, not CPU time
+_IDLE_MODULES = ('threading.py', 'selectors.py', 'queue.py')
+
+
+class StackSampler:
+    """Samples every thread's stack and writes folded stacks for flame graphs.
+
+    The output file holds one ``frame;frame;... count`` line per distinct stack,
+    cumulative since start, and is rewritten every ``flush_interval`` seconds.
+    Each worker process writes its own file: ``{pid}`` in ``path`` is replaced
+    by the process id, which is otherwise inserted before the extension.
+    """
+
+    def __init__(self, path=PROFILE_SAMPLE_PATH, interval=PROFILE_SAMPLE_INTERVAL,
+                 flush_interval=PROFILE_FLUSH_INTERVAL):
+        pid = str(os.getpid())
+        if '{pid}' in path:
+            path = path.replace('{pid}', pid)
+        else:
+            root, ext = os.path.splitext(path)
+            path = f"{root}.{pid}{ext}"
+        self.path = path
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.counts = Counter()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(5)
+        self.flush()
+
+    def sample(self):
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own or os.path.basename(frame.f_code.co_filename) in _IDLE_MODULES:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.counts[';'.join(reversed(stack))] += 1
+
+    def flush(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            for stack, count in self.counts.most_common():
+                fh.write(f"{stack} {count}\n")
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while not self._stopping.wait(self.interval):
+            self.sample()
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.flush_interval
+
+
+_last_snapshot = None
+
+
+def tracemalloc_snapshot(limit=30):
+    """Start tracing on the first call; afterwards return the top allocation sites
+    and the change since the previous snapshot."""
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(25)
+        _last_snapshot = None
+        return {'status': 'started'}
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    result = {
+        'status': 'tracing',
+        'current_bytes': current,
+        'peak_bytes': peak,
+        'top': [str(s) for s in snapshot.statistics('lineno')[:limit]],
+    }
+    if _last_snapshot is not None:
+        result['diff'] = [str(s) for s in snapshot.compare_to(_last_snapshot, 'lineno')[:limit]]
+    _last_snapshot = snapshot
+    return result
+
+
+def tracemalloc_stop():
+    global _last_snapshot
+    _last_snapshot = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
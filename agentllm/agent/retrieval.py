@@ -1,13 +1,33 @@
-import os, requests, json, time
+import os, re, requests, json, time, codecs, threading
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from pathlib import Path
 import numpy as np
 
+from agent.cache_pack import open_pack
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 CACHE_DIR = Path(os.getenv('CACHE_DIR', BASE_DIR / 'data' / 'cache'))
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+# Set CACHE_PACK_DIR once `python -m agent.cache_pack` has migrated the cache;
+# until then pages are only read from the loose files in CACHE_DIR
+CACHE_PACK = open_pack()
+
+# Limits for a single evidence page download
+FETCH_TIMEOUT = 10
+FETCH_MAX_BYTES = int(os.getenv('FETCH_MAX_BYTES', 2 * 1024 * 1024))
+FETCH_MAX_PARAGRAPHS = int(os.getenv('FETCH_MAX_PARAGRAPHS', 60))
+_CLOSING_P = re.compile(r'</p\s*>', flags=re.I)  # not </pre>, </path>, </picture>, ...
+FETCH_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Negative cache: URLs that failed or had no text are not retried until their
+# backoff expires. The delay doubles on each consecutive failure.
+FETCH_RETRY_BASE = int(os.getenv('FETCH_RETRY_BASE', 600))
+FETCH_RETRY_MAX = int(os.getenv('FETCH_RETRY_MAX', 86400))
+_failed_urls = {}  # url -> (consecutive failures, retry_at)
+_failed_urls_lock = threading.Lock()
+
 # Don't import or load model here - do it in a function
 MODEL = None
 
@@ -25,17 +45,29 @@ def domain_from_url(url):
     except:
         return ''
 
-def load_whitelist(path=BASE_DIR / 'data' / 'curated_sources.json'):
+def _curated_sources(path):
     if not os.path.exists(path):
-        return set()
+        return
     with open(path, 'r', encoding='utf-8') as f:
         cfg = json.load(f)
-    domains = set()
     for key in ('nepali_news_sources','fact_checking_sources','government_sources'):
         for s in cfg.get(key, []):
             host = s.get('base_url','').replace('http://','').replace('https://','').split('/')[0]
-            domains.add(host)
-    return domains
+            yield host, s.get('languages')
+
+def load_whitelist(path=BASE_DIR / 'data' / 'curated_sources.json'):
+    return {host for host, _ in _curated_sources(path)}
+
+def load_sources_by_language(path=BASE_DIR / 'data' / 'curated_sources.json'):
+    """Map language code -> whitelisted domains publishing in it.
+
+    Sources without a "languages" list are listed under every language, as '*'.
+    """
+    by_lang = {'*': set()}
+    for host, languages in _curated_sources(path):
+        for lang in languages or ['*']:
+            by_lang.setdefault(lang, set()).add(host)
+    return by_lang
 
 def google_search(query, num=8):
     key = os.getenv('GOOGLE_CSE_API_KEY','')
@@ -57,23 +89,97 @@ def google_search(query, num=8):
         })
     return results
 
+def _record_fetch_failure(url, reason):
+    with _failed_urls_lock:
+        failures = _failed_urls.get(url, (0, 0))[0] + 1
+        delay = min(FETCH_RETRY_BASE * 2 ** (failures - 1), FETCH_RETRY_MAX)
+        _failed_urls[url] = (failures, time.time() + delay)
+        if len(_failed_urls) > 10000:
+            now = time.time()
+            for u in [u for u, (_, retry_at) in _failed_urls.items() if retry_at < now]:
+                del _failed_urls[u]
+    print(f"      fetch skipped for {int(delay)}s: {url} ({reason})")
+
+
+def _download_html(url):
+    """Stream ``url`` and return its decoded body, or '' if it is not a usable page.
+
+    The body is decoded as it arrives and the download stops at FETCH_MAX_BYTES
+    or once FETCH_MAX_PARAGRAPHS closing </p> tags have been seen.
+    """
+    with requests.get(url, timeout=FETCH_TIMEOUT, stream=True, headers={'User-Agent':'MisInfoDetectAI/1.0'}) as r:
+        r.raise_for_status()
+        ctype = r.headers.get('Content-Type', '')
+        if ctype and ctype.split(';')[0].strip().lower() not in FETCH_CONTENT_TYPES:
+            raise ValueError(f'unsupported content type {ctype}')
+        length = r.headers.get('Content-Length', '')
+        if length.isdigit() and int(length) > FETCH_MAX_BYTES:
+            raise ValueError(f'body too large ({length} bytes)')
+
+        # requests falls back to ISO-8859-1 for text/* without a charset, which
+        # mangles Devanagari; only trust an explicit charset
+        m = re.search(r'charset=["\']?([\w.:-]+)', ctype, flags=re.I)
+        try:
+            decoder = codecs.getincrementaldecoder(m.group(1) if m else 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        chunks = []
+        received = 0
+        paragraphs = 0
+        tail = ''  # end of the previous chunk, so a tag split across chunks still counts
+        for chunk in r.iter_content(chunk_size=16384):
+            chunk = chunk[:FETCH_MAX_BYTES - received]
+            received += len(chunk)
+            text = decoder.decode(chunk)
+            chunks.append(text)
+            window = tail + text
+            # Matches that end inside the tail were counted with the previous chunk
+            paragraphs += sum(1 for m in _CLOSING_P.finditer(window) if m.end() > len(tail))
+            tail = window[-16:]
+            if received >= FETCH_MAX_BYTES or paragraphs >= FETCH_MAX_PARAGRAPHS:
+                break  # a cut-off multibyte sequence is dropped with the rest
+        else:
+            chunks.append(decoder.decode(b'', final=True))
+        return ''.join(chunks)
+
+
 def fetch_page_text(url):
     safe_name = url.replace('://','_').replace('/','_')
     cache_file = CACHE_DIR / (safe_name + '.txt')
     if cache_file.exists():
         return cache_file.read_text(encoding='utf-8')
+    if CACHE_PACK is not None:
+        text = CACHE_PACK.read(cache_file.name)
+        if text:
+            return text
+    with _failed_urls_lock:
+        failed = _failed_urls.get(url)
+    if failed and failed[1] > time.time():
+        return ''
     try:
-        r = requests.get(url, timeout=10, headers={'User-Agent':'MisInfoDetectAI/1.0'})
-        r.raise_for_status()
-        html = r.text
+        html = _download_html(url)
         soup = BeautifulSoup(html, 'html.parser')
         for s in soup(['script','style','noscript']):
             s.decompose()
-        text = '\n'.join([p.get_text().strip() for p in soup.find_all('p') if p.get_text().strip()])
-        cache_file.write_text(text, encoding='utf-8')
-        return text
+        paragraphs = []
+        for p in soup.find_all('p'):
+            t = p.get_text().strip()
+            if t:
+                paragraphs.append(t)
+                if len(paragraphs) >= FETCH_MAX_PARAGRAPHS:
+                    break
+        text = '\n'.join(paragraphs)
     except Exception as e:
+        _record_fetch_failure(url, e)
+        return ''
+    if not text:
+        _record_fetch_failure(url, 'no paragraph text')
         return ''
+    with _failed_urls_lock:
+        _failed_urls.pop(url, None)
+    cache_file.write_text(text, encoding='utf-8')
+    return text
 
 def rank_evidence_by_similarity(claim, candidates, top_k=5):
     if not candidates:
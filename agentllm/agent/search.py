@@ -0,0 +1,124 @@
+"""Cached, quota-aware wrapper around the Google Custom Search API.
+
+CSE responses are stored in a local SQLite file keyed by the normalized query,
+so repeated and near-identical claims cost no quota. Every real API call is
+counted against a daily budget; once it is spent, only cached queries are
+answered.
+"""
+import os, json, time, sqlite3, threading
+from contextlib import closing
+from pathlib import Path
+
+from agent.retrieval import google_search
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SEARCH_DB_PATH = Path(os.getenv('SEARCH_DB_PATH', BASE_DIR / 'data' / 'search_cache.sqlite'))
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 6 * 3600))
+CSE_DAILY_QUOTA = int(os.getenv('CSE_DAILY_QUOTA', 100))
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS search_cache (
+    query TEXT NOT NULL,
+    num INTEGER NOT NULL,
+    results TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (query, num)
+);
+CREATE TABLE IF NOT EXISTS cse_quota (
+    day TEXT PRIMARY KEY,
+    calls INTEGER NOT NULL
+);
+'''
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+class QuotaExceeded(RuntimeError):
+    pass
+
+
+def _connect():
+    global _initialized
+    if not _initialized:
+        SEARCH_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(SEARCH_DB_PATH, timeout=30, isolation_level=None)
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(SCHEMA)
+                _initialized = True
+    return conn
+
+
+def _quota_day():
+    # CSE quotas reset at midnight Pacific time; a fixed UTC-8 offset is close enough
+    return time.strftime('%Y-%m-%d', time.gmtime(time.time() - 8 * 3600))
+
+
+def normalize_query(query):
+    return ' '.join(query.lower().split())
+
+
+def quota_status():
+    with closing(_connect()) as conn:
+        row = conn.execute('SELECT calls FROM cse_quota WHERE day = ?', (_quota_day(),)).fetchone()
+    used = row[0] if row else 0
+    return {'day': _quota_day(), 'used': used, 'limit': CSE_DAILY_QUOTA, 'remaining': max(CSE_DAILY_QUOTA - used, 0)}
+
+
+def _reserve_quota(conn):
+    """Count one CSE call for today, or raise QuotaExceeded if none are left."""
+    day = _quota_day()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        row = conn.execute('SELECT calls FROM cse_quota WHERE day = ?', (day,)).fetchone()
+        used = row[0] if row else 0
+        if used >= CSE_DAILY_QUOTA:
+            raise QuotaExceeded(f'Daily CSE quota of {CSE_DAILY_QUOTA} queries used up')
+        conn.execute(
+            'INSERT INTO cse_quota (day, calls) VALUES (?, 1) '
+            'ON CONFLICT(day) DO UPDATE SET calls = calls + 1',
+            (day,),
+        )
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def cached_search(query, num=8):
+    """google_search() with a TTL cache keyed by the normalized query."""
+    key = normalize_query(query)
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            'SELECT results, fetched_at FROM search_cache WHERE query = ? AND num = ?', (key, num)
+        ).fetchone()
+        if row and row[1] > time.time() - SEARCH_CACHE_TTL:
+            return json.loads(row[0])
+        _reserve_quota(conn)
+        results = google_search(query, num=num)
+        conn.execute(
+            'INSERT OR REPLACE INTO search_cache (query, num, results, fetched_at) VALUES (?, ?, ?, ?)',
+            (key, num, json.dumps(results, ensure_ascii=False), time.time()),
+        )
+        # Expired entries are only useful until they are refreshed
+        conn.execute('DELETE FROM search_cache WHERE fetched_at < ?', (time.time() - SEARCH_CACHE_TTL,))
+    return results
+
+
+def plan_queries(claim, domains, general=True):
+    """Return (label, query) pairs to run in order until enough evidence is found.
+
+    The first query is restricted to the whitelisted ``domains``; the open web
+    query is only a fallback, since its results are filtered by the same
+    whitelist afterwards. ``general=False`` drops it altogether.
+    """
+    sites = sorted({d[4:] if d.startswith('www.') else d for d in domains if d})
+    queries = []
+    if sites:
+        queries.append(('whitelisted', f"{claim} (site:{' OR site:'.join(sites)})"))
+    if general or not sites:
+        queries.append(('general', claim))
+    return queries
@@ -6,16 +6,35 @@ import json
 import time
 import random
 import traceback
+import threading
+import heapq
 from typing import List, Dict, Optional
-from fastapi import FastAPI, HTTPException, Response
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 
-from agent.retrieval import google_search, load_whitelist, fetch_page_text, rank_evidence_by_similarity, domain_from_url
+from agent.retrieval import load_whitelist, fetch_page_text, rank_evidence_by_similarity, domain_from_url, CACHE_PACK
 from agent.llm_agent import call_groq
+from agent.http_cache import make_etag, not_modified, json_response
+from agent.jobs import JobQueue
+from agent.news_store import Story, iter_paragraphs, file_mentions
+from agent.search import cached_search, plan_queries, quota_status, CSE_DAILY_QUOTA
+from agent.language import route_claim
+from agent.profiling import (is_admin, profiled_endpoint, start_request_profile, stop_request_profile,
+                             StackSampler, PROFILE_SAMPLING, tracemalloc_snapshot, tracemalloc_stop)
+
+
+class ProfiledRoute(APIRoute):
+    """Route whose endpoint can be profiled per request (see profiling_middleware)."""
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, profiled_endpoint(endpoint), **kwargs)
+
 
 app = FastAPI(title='MisInfoDetectAI')
+app.router.route_class = ProfiledRoute
 
 # CORS settings
 FRONTEND_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*")
@@ -35,6 +54,52 @@ app.add_middleware(
 WHITELIST = load_whitelist()
 ALLOWED_DOMAINS = set(os.getenv('ALLOWED_SOURCES','').split(',')) if os.getenv('ALLOWED_SOURCES') else WHITELIST
 
+# Evidence gathering: each planned query asks CSE for SEARCH_RESULTS_PER_QUERY
+# results; once ENOUGH_EVIDENCE_ITEMS pages are collected the remaining
+# (fallback) queries are skipped. ENOUGH_EVIDENCE_ITEMS must not exceed
+# SEARCH_RESULTS_PER_QUERY, or the first query could never satisfy it.
+SEARCH_RESULTS_PER_QUERY = 5
+ENOUGH_EVIDENCE_ITEMS = min(int(os.getenv('ENOUGH_EVIDENCE_ITEMS', '3')), SEARCH_RESULTS_PER_QUERY)
+MAX_EVIDENCE_ITEMS = 6
+
+NEWS_CACHE_DIR = os.path.join(os.path.dirname(__file__), 'data', 'cache')
+NEWS_INDEX_MAX_ITEMS = int(os.getenv('NEWS_INDEX_MAX_ITEMS', '200'))
+
+STACK_SAMPLER = StackSampler() if PROFILE_SAMPLING else None
+
+
+@app.middleware('http')
+async def profiling_middleware(request: Request, call_next):
+    """Return a profile report instead of the response when an admin asks for one.
+
+    Send ``X-Profile: cprofile`` (or ``pyinstrument``), or ``?__profile=...``,
+    together with a valid ``X-Admin-Token``.
+    """
+    kind = request.headers.get('x-profile') or request.query_params.get('__profile')
+    if not kind or not is_admin(request):
+        return await call_next(request)
+    profile, token = start_request_profile(kind)
+    try:
+        response = await call_next(request)
+    finally:
+        stop_request_profile(token)
+    if profile.report is None:
+        return response
+    return PlainTextResponse(profile.report, headers={'X-Profiled-Status': str(response.status_code)})
+
+
+@app.on_event('startup')
+def start_stack_sampler():
+    if STACK_SAMPLER is not None:
+        STACK_SAMPLER.start()
+
+
+@app.on_event('shutdown')
+def stop_stack_sampler():
+    if STACK_SAMPLER is not None:
+        STACK_SAMPLER.stop()
+
+
 class ClaimRequest(BaseModel):
     claim: str
     lang: str = 'ne'
@@ -46,6 +111,8 @@ def root():
         "status": "running",
         "endpoints": {
             "verify_claim": "/api/verify_claim",
+            "verify_claim_jobs": "/api/verify_claim/jobs",
+            "search_quota": "/api/search/quota",
             "latest_news": "/api/latest_news",
             "news_detail": "/api/news/{news_id}",
             "docs": "/docs",
@@ -53,42 +120,35 @@ def root():
         }
     }
 
-@app.post('/api/verify_claim')
-def verify_claim(req: ClaimRequest):
-    """
-    Verify a claim by searching for evidence from whitelisted sources and analyzing with LLM.
+def _verify_claim(claim: str, lang: str = 'ne', strict: bool = False) -> Dict:
+    """Search whitelisted sources for evidence on ``claim`` and analyse it with the LLM.
+
+    By default search and LLM failures degrade to an UNCLEAR result. With
+    ``strict`` they are raised instead, so a background job can retry them.
     """
+    print(f"\n{'='*60}")
+    print(f"Processing claim: {claim}")
+    print(f"{'='*60}")
+
+    evidence_items = []
+
+    # Route by language: pick the sources and stages that help this claim
+    lang, route = route_claim(claim, lang)
+    search_domains = (route['domains'] & ALLOWED_DOMAINS) or ALLOWED_DOMAINS
+
+    # Step 1: Search for evidence - whitelisted sources first, the open web only if needed
     try:
-        claim = req.claim.strip()
-        if not claim:
-            raise HTTPException(status_code=400, detail='Empty claim')
-        
-        print(f"\n{'='*60}")
-        print(f"Processing claim: {claim}")
-        print(f"{'='*60}")
-        
-        evidence_items = []
-        
-        # Step 1: Search for evidence - prioritize local Nepali sources
-        try:
-            print("Step 1: Searching Google for evidence...")
-            
-            # First, search specifically on Nepali news sites
-            nepali_sites = ['kathmandupost.com', 'setopati.com', 'onlinekhabar.com', 
-                           'ekantipur.com', 'myrepublica.nagariknetwork.com', 'nepalnews.com']
-            site_query = f"{claim} (site:{' OR site:'.join(nepali_sites)})"
-            
-            local_results = google_search(site_query, num=5)
-            print(f"  Found {len(local_results)} local Nepali sources")
-            
-            # Then do a general search for international sources
-            general_results = google_search(claim, num=5)
-            print(f"  Found {len(general_results)} general sources")
-            
-            # Combine results, prioritizing local sources
-            search_results = local_results + general_results
-            print(f"  Total: {len(search_results)} search results")
-            
+        print(f"Step 1: Searching Google for evidence ({lang})...")
+        seen_urls = set()
+
+        for label, query in plan_queries(route['clean'](claim), search_domains, general=route['general_search']):
+            if len(evidence_items) >= ENOUGH_EVIDENCE_ITEMS:
+                print(f"  Enough evidence ({len(evidence_items)}), skipping {label} search")
+                break
+
+            search_results = cached_search(query, num=SEARCH_RESULTS_PER_QUERY)
+            print(f"  Found {len(search_results)} {label} results")
+
             # Step 2: Filter and fetch content from whitelisted domains
             print("Step 2: Filtering whitelisted sources...")
             for idx, result in enumerate(search_results, 1):
@@ -96,10 +156,13 @@ def verify_claim(req: ClaimRequest):
                     result_url = result.get('link', '')
                     result_domain = domain_from_url(result_url)
                     result_title = result.get('title', 'Untitled')
-                    
+                    if result_url in seen_urls:
+                        continue
+                    seen_urls.add(result_url)
+
                     # Normalize domain by removing www. prefix for comparison
                     normalized_domain = result_domain.replace('www.', '').replace('co.uk', 'com')
-                    
+
                     # Check if domain is whitelisted (handle www. prefix)
                     is_whitelisted = False
                     for allowed_domain in ALLOWED_DOMAINS:
@@ -107,11 +170,11 @@ def verify_claim(req: ClaimRequest):
                         if normalized_domain == normalized_allowed or normalized_domain.endswith('.' + normalized_allowed):
                             is_whitelisted = True
                             break
-                    
+
                     if is_whitelisted:
                         print(f"  [{idx}] ✓ Whitelisted: {result_domain}")
                         print(f"      Title: {result_title[:80]}")
-                        
+
                         # Fetch page content
                         content = fetch_page_text(result_url)
                         if content and len(content) > 100:
@@ -123,60 +186,78 @@ def verify_claim(req: ClaimRequest):
                                 'domain': result_domain
                             })
                             print(f"      Content fetched: {len(content)} chars")
-                            
-                            if len(evidence_items) >= 6:
+
+                            if len(evidence_items) >= MAX_EVIDENCE_ITEMS:
                                 break
                         else:
                             print(f"      ✗ Content too short or empty")
                     else:
                         print(f"  [{idx}] ✗ Not whitelisted: {result_domain}")
-                        
+
                 except Exception as e:
                     print(f"  [{idx}] ✗ Error processing result: {str(e)}")
                     continue
-            
-            print(f"\nStep 3: Collected {len(evidence_items)} evidence sources")
-            
-        except Exception as e:
-            print(f"✗ Search error: {str(e)}")
-            traceback.print_exc()
-        
-        # Step 3: If no evidence found, provide fallback
-        if not evidence_items:
-            print("⚠ No evidence found, using fallback response")
-            evidence_items = [{
-                'source': 'Search incomplete',
-                'url': '',
-                'snippet': 'Unable to find sufficient evidence from whitelisted sources. The claim could not be verified.',
-                'title': 'No Sources Found'
-            }]
-        
-        # Step 4: Call LLM for analysis
-        print(f"Step 4: Analyzing with LLM...")
-        try:
-            analysis = call_groq(claim, evidence_items, lang=req.lang)
-            print(f"  Verdict: {analysis.get('verdict', 'UNCLEAR')}")
-            print(f"  Confidence: {analysis.get('confidence', 0)}")
-        except Exception as e:
-            print(f"✗ LLM analysis error: {str(e)}")
-            traceback.print_exc()
-            analysis = {
-                'verdict': 'UNCLEAR',
-                'confidence': 0.0,
-                'explanation': f'Analysis unavailable: {str(e)}',
-                'evidence': []
-            }
-        
-        # Step 5: Prepare response
-        if 'evidence' not in analysis:
-            analysis['evidence'] = []
-        analysis['evidence'] = evidence_items
-        
-        print(f"{'='*60}")
-        print(f"✓ Claim verification complete")
-        print(f"{'='*60}\n")
+
+        print(f"\nStep 3: Collected {len(evidence_items)} evidence sources")
+        print(f"  CSE quota: {quota_status()['used']}/{CSE_DAILY_QUOTA} used today")
+
+    except Exception as e:
+        print(f"✗ Search error: {str(e)}")
+        traceback.print_exc()
+        if strict:
+            raise
+
+    # Step 3: If no evidence found, provide fallback
+    if not evidence_items:
+        print("⚠ No evidence found, using fallback response")
+        evidence_items = [{
+            'source': 'Search incomplete',
+            'url': '',
+            'snippet': 'Unable to find sufficient evidence from whitelisted sources. The claim could not be verified.',
+            'title': 'No Sources Found'
+        }]
+
+    # Step 4: Call LLM for analysis
+    print(f"Step 4: Analyzing with LLM...")
+    try:
+        analysis = call_groq(claim, evidence_items, lang=lang, raise_errors=strict)
+        print(f"  Verdict: {analysis.get('verdict', 'UNCLEAR')}")
+        print(f"  Confidence: {analysis.get('confidence', 0)}")
+    except Exception as e:
+        print(f"✗ LLM analysis error: {str(e)}")
+        traceback.print_exc()
+        if strict:
+            raise
+        analysis = {
+            'verdict': 'UNCLEAR',
+            'confidence': 0.0,
+            'explanation': f'Analysis unavailable: {str(e)}',
+            'evidence': []
+        }
+
+    # Step 5: Prepare response
+    if 'evidence' not in analysis:
+        analysis['evidence'] = []
+    analysis['evidence'] = evidence_items
+
+    print(f"{'='*60}")
+    print(f"✓ Claim verification complete")
+    print(f"{'='*60}\n")
+    
+    return analysis
+
+
+@app.post('/api/verify_claim')
+def verify_claim(req: ClaimRequest):
+    """
+    Verify a claim by searching for evidence from whitelisted sources and analyzing with LLM.
+    """
+    try:
+        claim = req.claim.strip()
+        if not claim:
+            raise HTTPException(status_code=400, detail='Empty claim')
         
-        return {'result': analysis}
+        return {'result': _verify_claim(claim, req.lang)}
         
     except HTTPException:
         raise
@@ -189,6 +270,76 @@ def verify_claim(req: ClaimRequest):
         )
 
 
+def _run_verification_job(payload: Dict) -> Dict:
+    # Strict: an exhausted CSE quota or a Groq error fails the attempt and the
+    # queue retries it, instead of storing a fallback verdict as the result
+    return {'result': _verify_claim(payload['claim'], payload.get('lang', 'ne'), strict=True)}
+
+
+JOB_QUEUE = JobQueue(
+    _run_verification_job,
+    workers=int(os.getenv('JOB_WORKERS', '2')),
+    max_attempts=int(os.getenv('JOB_MAX_ATTEMPTS', '3')),
+    result_ttl=int(os.getenv('JOB_RESULT_TTL', '3600')),
+)
+
+
+@app.on_event('startup')
+def start_job_workers():
+    JOB_QUEUE.start()
+
+
+@app.on_event('shutdown')
+def stop_job_workers():
+    JOB_QUEUE.stop()
+
+
+@app.post('/api/verify_claim/jobs', status_code=202)
+def submit_verify_claim_job(req: ClaimRequest):
+    """Queue a claim for background verification and return its job ID immediately."""
+    claim = req.claim.strip()
+    if not claim:
+        raise HTTPException(status_code=400, detail='Empty claim')
+    job_id = JOB_QUEUE.submit({'claim': claim, 'lang': req.lang})
+    return {
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': f'/api/verify_claim/jobs/{job_id}'
+    }
+
+
+@app.get('/api/verify_claim/jobs/{job_id}')
+def verify_claim_job_status(job_id: str):
+    """Return the status of a verification job, and its result once done."""
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='Job not found or expired')
+    return job
+
+
+@app.get('/api/search/quota')
+def search_quota():
+    """Return today's Google CSE usage against the configured daily quota."""
+    return quota_status()
+
+
+@app.get('/api/admin/tracemalloc')
+def admin_tracemalloc(request: Request, limit: int = 30):
+    """Start tracemalloc on the first call, then return top allocations and the diff since the last call."""
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail='Forbidden')
+    return tracemalloc_snapshot(limit)
+
+
+@app.delete('/api/admin/tracemalloc')
+def admin_tracemalloc_stop(request: Request):
+    """Stop tracemalloc and drop the stored snapshot."""
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail='Forbidden')
+    tracemalloc_stop()
+    return {'status': 'stopped'}
+
+
 def _convert_filename_to_url(filename: str) -> Optional[str]:
     """Convert cached filename back to original URL."""
     if not filename.startswith('https_') or not filename.endswith('.txt'):
@@ -214,7 +365,7 @@ def _convert_filename_to_url(filename: str) -> Optional[str]:
     return None
 
 
-def _determine_verification_status(title: str, source_name: str) -> str:
+def _determine_verification_status(title: str, source_name: str, rng=random) -> str:
     """
     Enhanced heuristic to determine verification status with more variety.
     """
@@ -248,19 +399,26 @@ def _determine_verification_status(title: str, source_name: str) -> str:
     # Check if source is trusted - higher chance for TRUE
     if any(trusted in source_lower for trusted in trusted_sources):
         # 70% chance TRUE, 20% UNCLEAR, 10% FALSE for trusted sources
-        status_choice = random.choices(['TRUE', 'UNCLEAR', 'FALSE'], weights=[70, 20, 10])[0]
+        status_choice = rng.choices(['TRUE', 'UNCLEAR', 'FALSE'], weights=[70, 20, 10])[0]
         return status_choice
     
     # For other sources - more balanced distribution
     # 40% UNCLEAR, 35% TRUE, 25% FALSE
-    return random.choices(['UNCLEAR', 'TRUE', 'FALSE'], weights=[40, 35, 25])[0]
+    return rng.choices(['UNCLEAR', 'TRUE', 'FALSE'], weights=[40, 35, 25])[0]
 
 
-def _load_cached_news(cache_dir=None, max_items=20, include_all_samples=False):
-    """Load real news items from cache + some international news for variety."""
-    base = cache_dir or os.path.join(os.path.dirname(__file__), 'data', 'cache')
+def _load_cached_news(cache_dir=None, max_items=20, include_all_samples=False, rng=None, now=None, pack=None):
+    """Load real news items from cache + some international news for variety.
+
+    Pass a seeded ``rng`` and a fixed ``now`` to get the same items back for
+    the same cache contents. With a CachePack, pages come from the pack plus
+    any loose files it does not hold yet.
+    """
+    base = cache_dir or NEWS_CACHE_DIR
+    rng = rng or random.Random()
+    now = time.time() if now is None else now
     items = []
-    seen_stories = {}  # Track similar stories and their sources
+    seen_stories = []  # (title words, story) pairs for merging similar stories
     
     # Add some fresh international news to mix with cached content
     international_news = [
@@ -309,53 +467,53 @@ def _load_cached_news(cache_dir=None, max_items=20, include_all_samples=False):
     ]
     
     # Add international news first (with some randomization)
-    random.shuffle(international_news)
+    rng.shuffle(international_news)
     for i, news in enumerate(international_news[:4]):  # Include 4 international stories
         # Generate random view count
-        views = random.randint(1200, 45000)
+        views = rng.randint(1200, 45000)
         
-        item_id = f"intl_{i+1}"
-        news_item = {
-            'id': item_id,
-            'title': news['title'],
-            'snippet': news['snippet'],
-            'full_text': f"{news['title']}\n\n{news['snippet']}",
-            'source': news['source'],
-            'sources': [news['source']],
-            'published_at': time.time() - random.randint(3600, 86400),  # 1-24 hours ago
-            'verification_status': news['verification_status'],
-            'source_url': news['source_url'],
-            'views': views
-        }
+        news_item = Story(
+            id=f"intl_{i+1}",
+            title=news['title'],
+            snippet=news['snippet'],
+            sources=[news['source']],
+            published_at=now - rng.randint(3600, 86400),  # 1-24 hours ago
+            verification_status=news['verification_status'],
+            source_url=news['source_url'],
+            views=views
+        )
         items.append(news_item)
         
         # Track this story
-        seen_stories[item_id] = {
-            'normalized_title': news['title'].lower().strip(),
-            'sources': [news['source']]
-        }
+        seen_stories.append((frozenset(news['title'].lower().strip().split()), news_item))
     
     # Process real cached news files
+    # Each page is (file name, path, mtime, start, end, recovered url)
     try:
-        files = sorted([os.path.join(base, f) for f in os.listdir(base) if os.path.isfile(os.path.join(base, f))], key=os.path.getmtime, reverse=True)
+        with os.scandir(base) as it:
+            files = sorted(((e.name, e.path, e.stat().st_mtime, 0, None, None) for e in it if e.is_file()),
+                           key=lambda f: f[2], reverse=True)
     except Exception:
+        files = []
+    if pack is not None:
+        files = heapq.merge((f for f in files if not pack.has_file(f[0], f[2])), pack.pages(),
+                            key=lambda f: f[2], reverse=True)
+    elif not files:
         return items  # Return international news if no cache directory
 
-    for file_path in files:
+    for file_name, file_path, mtime, start, end, recovered_url in files:
+        # Non-empty lines are candidate headlines/snippets. Only the first 15 are
+        # considered as headlines, plus the 4 that may follow one as its body.
         try:
-            with open(file_path, 'r', encoding='utf-8') as fh:
-                text = fh.read()
+            parts = list(iter_paragraphs(file_path, 15 + 4, start, end))
         except Exception:
             continue
-
-        # Split into paragraphs and use non-empty lines as candidate headlines/snippets
-        parts = [p.strip() for p in text.split('\n') if p.strip()]
         
         # Extract up to 2 good headlines per file to get more diversity (reduced from 3)
         headlines_from_file = 0
         max_headlines_per_file = 2
         
-        for i, p in enumerate(parts[:15]):  # Check first 15 paragraphs
+        for i, (p, _, _) in enumerate(parts[:15]):  # Check first 15 paragraphs
             if headlines_from_file >= max_headlines_per_file:
                 break
                 
@@ -380,26 +538,25 @@ def _load_cached_news(cache_dir=None, max_items=20, include_all_samples=False):
             
             # Normalize title for comparison
             normalized_title = title.lower().strip()
-            title_words = set(normalized_title.split())
+            title_words = frozenset(normalized_title.split())
             
             # Check if this is a similar story we've seen before
-            similar_story_id = None
-            for story_id, story_data in seen_stories.items():
-                story_words = set(story_data['normalized_title'].split())
+            similar_story = None
+            for story_words, story in seen_stories:
                 # If more than 60% of significant words overlap, consider it the same story
                 if title_words and len(title_words.intersection(story_words)) / max(len(title_words), len(story_words)) > 0.6:
-                    similar_story_id = story_id
+                    similar_story = story
                     break
             
             # Get snippet from next paragraph
             snippet = ''
             if i + 1 < len(parts):
-                snippet = parts[i + 1][:400]
+                snippet = parts[i + 1][0][:400]
             elif i + 2 < len(parts):
-                snippet = parts[i + 2][:400]
+                snippet = parts[i + 2][0][:400]
             
             # Clean source name
-            source_name = os.path.basename(file_path).replace('.txt', '').replace('_', ' ').replace('-', ' ')
+            source_name = file_name.replace('.txt', '').replace('_', ' ').replace('-', ' ')
             source_name = ' '.join(word.capitalize() for word in source_name.split())
             if 'nepalnews' in source_name.lower():
                 source_name = 'Nepal News'
@@ -410,36 +567,24 @@ def _load_cached_news(cache_dir=None, max_items=20, include_all_samples=False):
             elif 'myrepublica' in source_name.lower():
                 source_name = 'My Republica'
             
-            if similar_story_id:
+            if similar_story is not None:
                 # Add this source to existing story
-                existing_story = seen_stories[similar_story_id]
-                if source_name not in existing_story['sources']:
-                    existing_story['sources'].append(source_name)
-                    # Update the story in items list
-                    for item in items:
-                        if item['id'] == similar_story_id:
-                            item['sources'] = existing_story['sources']
-                            item['source'] = ', '.join(existing_story['sources'][:2])  # Show first 2 sources
-                            if len(existing_story['sources']) > 2:
-                                additional_count = len(existing_story['sources']) - 2
-                                item['source'] += f' +{additional_count} more'
-                            break
+                similar_story.add_source(source_name)
             else:
                 # Create new story
                 item_id = f"story_{len(items) + 1}"
                 
                 # Generate random view count for cached news
-                views = random.randint(500, 25000)
+                views = rng.randint(500, 25000)
                 
                 # Determine verification status for local cached news
-                verification_status = _determine_verification_status(title, source_name)
+                verification_status = _determine_verification_status(title, source_name, rng)
                 
                 # Generate source URL for cached files
                 source_url = ''
-                file_name = os.path.basename(file_path)
                 if file_name.startswith('https_'):
                     # Try to reconstruct URL from filename
-                    source_url = _convert_filename_to_url(file_name) or ''
+                    source_url = _convert_filename_to_url(file_name) or recovered_url or ''
                 else:
                     # Fallback URL generation based on source name
                     if 'nepal news' in source_name.lower() or 'nepalnews' in source_name.lower():
@@ -453,26 +598,26 @@ def _load_cached_news(cache_dir=None, max_items=20, include_all_samples=False):
                     elif 'online khabar' in source_name.lower():
                         source_url = 'https://english.onlinekhabar.com'
                 
-                new_item = {
-                    'id': item_id,
-                    'title': title,
-                    'snippet': snippet,
-                    'full_text': '\n'.join(parts[i:i+5]),
-                    'source': source_name,
-                    'sources': [source_name],  # List of all sources for this story
-                    'published_at': os.path.getmtime(file_path),
-                    'verification_status': verification_status,
-                    'source_url': source_url,
-                    'views': views  # Add random view count
-                }
+                # The body (this paragraph and the next four) stays on disk
+                body = parts[i:i+5]
+                new_item = Story(
+                    id=item_id,
+                    title=title,
+                    snippet=snippet,
+                    sources=[source_name],  # List of all sources for this story
+                    published_at=mtime,
+                    verification_status=verification_status,
+                    source_url=source_url,
+                    views=views,  # Add random view count
+                    path=file_path,
+                    start=body[0][1],
+                    end=body[-1][2]
+                )
                 
                 items.append(new_item)
                 
                 # Track this story
-                seen_stories[item_id] = {
-                    'normalized_title': normalized_title,
-                    'sources': [source_name]
-                }
+                seen_stories.append((title_words, new_item))
                 
                 headlines_from_file += 1
                 
@@ -486,64 +631,137 @@ def _load_cached_news(cache_dir=None, max_items=20, include_all_samples=False):
     return items
 
 
+NEWS_CLOCK_STEP = 3600  # the index's "now" advances once an hour, not on every request
+
+_news_index_lock = threading.Lock()
+_news_index = {'version': None, 'items': []}
+
+
+def _news_index_version(cache_dir=None, now=None):
+    """Cheap version stamp for the news index: '<cache stamp>-<hour>'.
+
+    The cache stamp is the newest of the directory's and the pack index's
+    mtimes. fetch_page_text only ever adds new files, which bumps the
+    directory mtime, and every migration run rewrites the pack index, so it
+    changes whenever the cached pages do. The hour is the wall clock the
+    index is built against (sample stories are dated relative to it).
+    """
+    try:
+        stamp = os.stat(cache_dir or NEWS_CACHE_DIR).st_mtime_ns
+    except OSError:
+        stamp = 0
+    if CACHE_PACK is not None:
+        stamp = max(stamp, CACHE_PACK.version())
+    now = time.time() if now is None else now
+    return f"{stamp:x}-{int(now // NEWS_CLOCK_STEP):x}"
+
+
+def _get_news_index():
+    """Return (version, items), rebuilding the index only when the cache changed.
+
+    The build is seeded from the cache stamp and uses the start of the
+    version's hour as ``now``, so every worker produces the same items (and
+    therefore the same ETags) for the same cache contents and hour.
+    """
+    version = _news_index_version()
+    stamp, _, hour = version.partition('-')
+    with _news_index_lock:
+        if _news_index['version'] != version:
+            _news_index['items'] = _load_cached_news(
+                max_items=NEWS_INDEX_MAX_ITEMS,
+                rng=random.Random(stamp),
+                now=int(hour, 16) * NEWS_CLOCK_STEP,
+                pack=CACHE_PACK,
+            )
+            _news_index['version'] = version
+        return version, _news_index['items']
+
+
 @app.get('/api/latest_news')
-def latest_news(response: Response, limit: int = 15):
-    """Return a list of latest news items including international and diverse content."""
-    # Add cache-busting headers to ensure fresh content on each request
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    response.headers["Pragma"] = "no-cache" 
-    response.headers["Expires"] = "0"
-    
-    items = _load_cached_news(max_items=limit * 2)  # Load more to ensure variety
-    
+def latest_news(request: Request, limit: int = 15, cursor: Optional[str] = None):
+    """Return a page of latest news items including international and diverse content.
+
+    ``cursor`` is the ``next_cursor`` value from the previous page. It names
+    the index version it was issued for; once the index has been rebuilt the
+    offsets no longer line up, so a stale cursor gets a 409 and the client
+    starts again from the first page.
+    """
+    if limit < 1 or limit > 100:
+        raise HTTPException(status_code=400, detail='limit must be between 1 and 100')
+    version = _news_index_version()
+    offset = 0
+    if cursor:
+        cursor_version, _, cursor_offset = cursor.rpartition('.')
+        try:
+            offset = int(cursor_offset)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+        if not cursor_version or offset < 0:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+        if cursor_version != version:
+            raise HTTPException(status_code=409, detail='News list has changed, reload from the first page')
+
+    etag = make_etag(request, 'latest_news', version, limit, offset)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    items_version, items = _get_news_index()
+    if items_version != version:
+        # The index moved on between the cursor check and the build
+        if cursor:
+            raise HTTPException(status_code=409, detail='News list has changed, reload from the first page')
+        version = items_version
+    etag = make_etag(request, 'latest_news', version, limit, offset)
+    page = items[offset:offset + limit]
+
     # Simplify output for frontend
     out = []
-    for it in items:
-        # Add source_url to each news item
-        source_url = it.get('source_url', '')
-        
+    for it in page:
         out.append({
-            'id': it['id'],
-            'title': it['title'],
-            'snippet': it['snippet'],
-            'source': it['source'],
-            'sources': it.get('sources', [it['source']]),  # All sources for this story
-            'source_count': len(it.get('sources', [it['source']])),
-            'published_at': it['published_at'],
-            'verification_status': it.get('verification_status', 'UNCLEAR'),
-            'source_url': source_url,  # Include URL for "View Source" buttons
-            'views': it.get('views', 0)  # Include view count
+            'id': it.id,
+            'title': it.title,
+            'snippet': it.snippet,
+            'source': it.source,
+            'sources': list(it.sources),  # All sources for this story
+            'source_count': len(it.sources),
+            'published_at': it.published_at,
+            'verification_status': it.verification_status or 'UNCLEAR',
+            'source_url': it.source_url,  # Include URL for "View Source" buttons
+            'views': it.views  # Include view count
         })
-    return {'news': out[:limit]}  # Return only the requested number of items
+    next_cursor = f"{version}.{offset + limit}" if offset + limit < len(items) else None
+    return json_response(request, {'news': out, 'next_cursor': next_cursor}, etag)
 
 
 @app.get('/api/news/{news_id}')
-def news_detail(news_id: str):
-    """Return detailed news info and run a credibility check (using existing LLM pipeline) on the headline."""
-    items = _load_cached_news(max_items=200)
+def news_detail(news_id: str, request: Request):
+    """Return detailed news info and run a credibility check (using existing LLM pipeline) on the headline.
+
+    The ETag is a hash of the response body, which includes the live LLM
+    verdict, so it can only be computed after the Groq call. A matching
+    If-None-Match still gets a 304, but that saves bandwidth, not the call.
+    """
+    _, items = _get_news_index()
     match = None
     for it in items:
-        if it['id'] == news_id:
+        if it.id == news_id:
             match = it
             break
     if not match:
         raise HTTPException(status_code=404, detail='News item not found')
 
-    title = match.get('title','')
-    full = match.get('full_text','')
+    title = match.title
+    # The body is only read from the cache file here, for the one story requested
+    full = match.full_text
 
     # Use the existing source_url from the matched item if available
-    source_url = match.get('source_url', '')
+    source_url = match.source_url
     
     # Only try to create/reconstruct URL if not already provided
     if not source_url:
         # Create a proper URL based on the source name
-        source_name = match.get('source', '')
-    
-    # Only try to create/reconstruct URL if not already provided
-    if not source_url:
-        # Create a proper URL based on the source name
-        source_name = match.get('source', '')
+        source_name = match.source
         
         # Enhanced source URL mapping with more comprehensive coverage
         if 'nepal news' in source_name.lower() or 'nepalnews' in source_name.lower():
@@ -578,23 +796,19 @@ def news_detail(news_id: str):
             if not is_sample_news:
                 # Try to find the cached file that matches this news item and convert filename to URL
                 try:
-                    cached_files = os.listdir(os.path.join(os.path.dirname(__file__), 'data', 'cache'))
+                    cached_files = os.listdir(NEWS_CACHE_DIR)
+                    
+                    title_words = set(title.lower().split())
                     
                     # Try to match this news item to a cached file by checking content similarity
                     for file in cached_files:
                         if file.startswith('https_'):
                             try:
-                                file_path = os.path.join(os.path.dirname(__file__), 'data', 'cache', file)
-                                with open(file_path, 'r', encoding='utf-8') as f:
-                                    file_content = f.read()
-                                    
-                                # Check if this file contains our article by looking for title overlap
-                                title_words = set(title.lower().split())
-                                content_words = set(file_content.lower().split())
+                                file_path = os.path.join(NEWS_CACHE_DIR, file)
                                 
-                                # Calculate overlap - if significant overlap, this is likely our article
-                                overlap = len(title_words.intersection(content_words))
-                                if overlap >= min(3, len(title_words) // 2):
+                                # Check if this file contains our article by looking for title overlap -
+                                # if significant overlap, this is likely our article
+                                if file_mentions(file_path, title_words, min(3, len(title_words) // 2)):
                                     # Convert the filename to the original URL
                                     reconstructed_url = _convert_filename_to_url(file)
                                     if reconstructed_url:
@@ -621,17 +835,20 @@ def news_detail(news_id: str):
     else:
         # If no URL mapping found, create a fallback with source name but no URL
         evidence_items.append({
-            'source': match.get('source', 'Unknown Source'), 
+            'source': match.source or 'Unknown Source', 
             'url': '', 
             'snippet': full[:800],
             'title': title
         })
 
-    # Call LLM analysis
+    # Call LLM analysis. The body carries the live verdict, so its ETag is taken
+    # from the serialized response; a fallback verdict must not be cached at all
+    cacheable = True
     try:
-        analysis = call_groq(title, evidence_items, lang='ne')
+        analysis = call_groq(title, evidence_items, lang='ne', raise_errors=True)
     except Exception as e:
         print(f"Error in LLM analysis: {e}")
+        cacheable = False
         analysis = {
             'verdict': 'UNCLEAR',
             'confidence': 0.0,
@@ -646,14 +863,14 @@ def news_detail(news_id: str):
     # Add our evidence items with proper URLs to the analysis
     analysis['evidence'] = evidence_items
 
-    return {
-        'id': match['id'],
+    return json_response(request, {
+        'id': match.id,
         'title': title,
         'full_text': full,
-        'source': match.get('source'),
-        'published_at': match.get('published_at'),
+        'source': match.source,
+        'published_at': match.published_at,
         'analysis': analysis
-    }
+    }, cacheable=cacheable)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+import os, sys, random, tempfile, tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from agent.news_store import Story
+
+N = int(os.getenv('BENCH_STORIES', '100000'))
+SOURCES = ['Kathmandu Post', 'Nepal News', 'My Republica', 'Online Khabar', 'Setopati']
+
+def fake_article(rng, i):
+    title = f"Story {i}: " + ' '.join(rng.choice(['Flood', 'Budget', 'Election', 'Relief', 'Cabinet', 'Province']) for _ in range(8))
+    paras = [title] + [' '.join(str(rng.random()) for _ in range(40)) for _ in range(4)]
+    return title, paras
+
+def measure(build):
+    tracemalloc.start()
+    records = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, current
+
+def build_dicts(articles):
+    # Shape of the records _load_cached_news used to keep
+    items, seen = [], {}
+    for i, (title, paras, path, start, end) in enumerate(articles):
+        source = ''.join(SOURCES[i % len(SOURCES)])  # fresh string per item, as parsed from file names
+        items.append({
+            'id': f'story_{i}', 'title': title, 'snippet': paras[1][:400],
+            'full_text': '\n'.join(paras), 'source': source, 'sources': [source],
+            'published_at': 0.0, 'verification_status': 'UNCLEAR', 'source_url': '', 'views': i,
+        })
+        seen[f'story_{i}'] = {'normalized_title': title.lower().strip(), 'sources': [source]}
+    return items, seen
+
+def build_stories(articles):
+    return [
+        Story(f'story_{i}', title, paras[1][:400], [''.join(SOURCES[i % len(SOURCES)])], 0.0, 'UNCLEAR',
+              views=i, path=path, start=start, end=end)
+        for i, (title, paras, path, start, end) in enumerate(articles)
+    ]
+
+def main():
+    rng = random.Random(0)
+    with tempfile.NamedTemporaryFile('wb', suffix='.txt', delete=False) as fh:
+        articles = []
+        for i in range(N):
+            title, paras = fake_article(rng, i)
+            start = fh.tell()
+            fh.write(('\n'.join(paras) + '\n').encode('utf-8'))
+            articles.append((title, paras, fh.name, start, fh.tell()))
+    try:
+        _, dict_bytes = measure(lambda: build_dicts(articles))
+        stories, story_bytes = measure(lambda: build_stories(articles))
+        print(f'{N} stories')
+        print(f'  dict records:  {dict_bytes / 2**20:8.1f} MiB')
+        print(f'  Story records: {story_bytes / 2**20:8.1f} MiB')
+        print(f'  per 100k:      {dict_bytes * 1e5 / N / 2**20:8.1f} -> {story_bytes * 1e5 / N / 2**20:.1f} MiB')
+        assert stories[-1].full_text == '\n'.join(articles[-1][1])
+    finally:
+        os.unlink(articles[0][2])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+import os, sys, atexit, shutil, tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# app opens its job queue, search cache and page cache at import time; point
+# them at a scratch directory so tests never write under data/ in the source tree
+_tmp = tempfile.mkdtemp(prefix='agentllm-tests-')
+atexit.register(shutil.rmtree, _tmp, True)
+os.environ.setdefault('JOB_DB_PATH', os.path.join(_tmp, 'jobs.sqlite'))
+os.environ.setdefault('SEARCH_DB_PATH', os.path.join(_tmp, 'search.sqlite'))
+os.environ.setdefault('CACHE_DIR', os.path.join(_tmp, 'cache'))
@@ -0,0 +1,68 @@
+import os, sys, sqlite3
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.cache_pack import migrate, prune, CachePack, PACK_NAME, INDEX_NAME
+
+BODY = 'Kathmandu valley was shaken by a moderate earthquake on Tuesday morning, officials said.\n'
+
+
+def _write(src, name, text):
+    path = src / name
+    path.write_bytes(text if isinstance(text, bytes) else text.encode('utf-8'))
+    return path
+
+
+def _statuses(dest):
+    with sqlite3.connect(dest / INDEX_NAME) as conn:
+        return dict(conn.execute('SELECT name, status FROM files'))
+
+
+def test_migrate_dedups_identical_bodies(tmp_path):
+    src, dest = tmp_path / 'cache', tmp_path / 'pack'
+    src.mkdir()
+    _write(src, 'https_kathmandupost.com_a.txt', BODY)
+    _write(src, 'https_kathmandupost.com_b.txt', '\n' + BODY + '\n')
+    _write(src, 'https_kathmandupost.com_c.txt', 'Menu\nHome\n')
+
+    stats = migrate(src, dest, workers=1)
+
+    assert stats['packed'] == 1 and stats['duplicate'] == 1 and stats['boilerplate'] == 1
+    assert os.path.getsize(dest / PACK_NAME) == len(BODY.encode('utf-8'))
+    assert CachePack(dest).read('https_kathmandupost.com_b.txt') == BODY.strip()
+
+
+def test_rerun_skips_files_already_migrated(tmp_path):
+    src, dest = tmp_path / 'cache', tmp_path / 'pack'
+    src.mkdir()
+    _write(src, 'https_kathmandupost.com_a.txt', BODY)
+    migrate(src, dest, workers=1)
+
+    assert migrate(src, dest, workers=1)['scanned'] == 0
+
+
+def test_uncommitted_pack_tail_is_truncated_on_resume(tmp_path):
+    src, dest = tmp_path / 'cache', tmp_path / 'pack'
+    src.mkdir()
+    _write(src, 'https_kathmandupost.com_a.txt', BODY)
+    migrate(src, dest, workers=1)
+    with open(dest / PACK_NAME, 'ab') as pack:
+        pack.write(b'half-written body from an interrupted run')
+
+    other = BODY.replace('Tuesday', 'Wednesday')
+    _write(src, 'https_kathmandupost.com_b.txt', other)
+    migrate(src, dest, workers=1)
+
+    assert os.path.getsize(dest / PACK_NAME) == len(BODY.encode('utf-8')) + len(other.encode('utf-8'))
+    assert CachePack(dest).read('https_kathmandupost.com_b.txt') == other.strip()
+
+
+def test_prune_keeps_unreadable_files(tmp_path):
+    src, dest = tmp_path / 'cache', tmp_path / 'pack'
+    src.mkdir()
+    packed = _write(src, 'https_kathmandupost.com_a.txt', BODY)
+    unreadable = _write(src, 'https_kathmandupost.com_bad.txt', b'\xff\xfe broken')
+    migrate(src, dest, workers=1)
+    assert _statuses(dest)[unreadable.name] == 'unreadable'
+
+    assert prune(src, dest) == 1
+    assert not packed.exists() and unreadable.exists()
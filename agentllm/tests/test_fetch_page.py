@@ -0,0 +1,126 @@
+import pytest
+
+for mod in ('requests', 'bs4', 'numpy'):
+    pytest.importorskip(mod)
+
+import requests
+from agent import retrieval
+from agent.retrieval import fetch_page_text, _download_html
+
+
+class FakeResponse:
+    """Streamed response: records how many chunks were read."""
+
+    def __init__(self, chunks, content_type='text/html; charset=utf-8', length=None):
+        self.chunks = chunks
+        self.headers = {'Content-Type': content_type}
+        if length is not None:
+            self.headers['Content-Length'] = str(length)
+        self.read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+@pytest.fixture
+def web(tmp_path, monkeypatch):
+    """Route requests.get to ``state['response']`` (or raise it) on a fake clock."""
+    state = {'response': None, 'calls': 0, 'now': 1_700_000_000.0}
+
+    def fake_get(url, **kwargs):
+        state['calls'] += 1
+        if isinstance(state['response'], Exception):
+            raise state['response']
+        return state['response']
+
+    monkeypatch.setattr(retrieval.requests, 'get', fake_get)
+    monkeypatch.setattr(retrieval.time, 'time', lambda: state['now'])
+    monkeypatch.setattr(retrieval, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(retrieval, 'CACHE_PACK', None)
+    monkeypatch.setattr(retrieval, '_failed_urls', {})
+    return state
+
+
+def test_download_stops_after_closing_p_split_across_chunks(web, monkeypatch):
+    monkeypatch.setattr(retrieval, 'FETCH_MAX_PARAGRAPHS', 3)
+    web['response'] = r = FakeResponse([b'<p>one</', b'p><p>two</P', b'\n><p>three</p', b'>', b'<p>four</p>'])
+
+    html = _download_html('https://example.com/a')
+
+    assert r.read == 4
+    assert html.endswith('<p>three</p>')
+
+
+def test_pre_and_path_closing_tags_are_not_paragraphs(web, monkeypatch):
+    monkeypatch.setattr(retrieval, 'FETCH_MAX_PARAGRAPHS', 1)
+    noise = b'<pre>x</pre><svg><path d="M0"></path></svg><picture></picture><param></param>'
+    web['response'] = r = FakeResponse([noise] * 5 + [b'<p>body</p>'])
+
+    _download_html('https://example.com/a')
+
+    assert r.read == 6
+
+
+def test_download_is_capped_at_max_bytes(web, monkeypatch):
+    monkeypatch.setattr(retrieval, 'FETCH_MAX_BYTES', 10)
+    web['response'] = r = FakeResponse([b'a' * 8, b'b' * 8, b'c' * 8])
+
+    assert _download_html('https://example.com/a') == 'a' * 8 + 'bb'
+    assert r.read == 2
+
+
+def test_charset_handling(web):
+    # No charset: UTF-8, even for a character split across chunks
+    body = 'नेपाल'.encode('utf-8')
+    web['response'] = FakeResponse([body[:4], body[4:]], content_type='text/html')
+    assert _download_html('https://example.com/a') == 'नेपाल'
+
+    web['response'] = FakeResponse(['café'.encode('latin-1')], content_type='text/html; charset=ISO-8859-1')
+    assert _download_html('https://example.com/b') == 'café'
+
+    web['response'] = FakeResponse([b'ok'], content_type='text/html; charset=no-such-codec')
+    assert _download_html('https://example.com/c') == 'ok'
+
+
+@pytest.mark.parametrize('response', [
+    FakeResponse([b'%PDF-1.7'], content_type='application/pdf'),
+    FakeResponse([b'<p>huge</p>'], length=50 * 1024 * 1024),
+])
+def test_unusable_responses_are_rejected_unread(web, response):
+    web['response'] = response
+
+    assert fetch_page_text('https://example.com/doc') == ''
+    assert response.read == 0
+    assert 'https://example.com/doc' in retrieval._failed_urls
+
+
+def test_failed_url_is_skipped_until_its_backoff_expires(web, tmp_path):
+    url = 'https://example.com/flaky'
+    web['response'] = requests.ConnectionError('connection reset')
+    base = retrieval.FETCH_RETRY_BASE
+
+    assert fetch_page_text(url) == '' and web['calls'] == 1
+    web['now'] += base - 1
+    assert fetch_page_text(url) == '' and web['calls'] == 1
+
+    web['now'] += 2
+    assert fetch_page_text(url) == '' and web['calls'] == 2
+    web['now'] += 2 * base - 1  # the delay doubled after the second failure
+    assert fetch_page_text(url) == '' and web['calls'] == 2
+
+    web['now'] += 2
+    web['response'] = FakeResponse([b'<html><p>Recovered text.</p></html>'])
+    assert fetch_page_text(url) == 'Recovered text.' and web['calls'] == 3
+    assert url not in retrieval._failed_urls
+    assert (tmp_path / 'https_example.com_flaky.txt').read_text(encoding='utf-8') == 'Recovered text.'
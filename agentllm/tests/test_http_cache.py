@@ -0,0 +1,97 @@
+import pytest
+
+app = pytest.importorskip('app')
+from fastapi.testclient import TestClient
+from agent import http_cache
+from agent.http_cache import negotiate_encoding
+from agent.llm_agent import LLMUpstreamError
+from agent.news_store import Story
+
+
+class FakeRequest:
+    def __init__(self, accept_encoding):
+        self.headers = {'accept-encoding': accept_encoding}
+
+
+@pytest.mark.parametrize('header, encoding', [
+    ('', None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('gzip, br', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+    ('br;q=0.0, gzip;q=0', None),
+    ('GZIP;q=0.5', 'gzip'),
+    ('br;q=bogus, gzip', 'gzip'),
+])
+def test_negotiate_encoding(header, encoding, monkeypatch):
+    monkeypatch.setattr(http_cache, 'brotli', object())  # pretend brotli is installed
+    assert negotiate_encoding(FakeRequest(header)) == encoding
+
+
+def test_brotli_is_not_offered_when_unavailable(monkeypatch):
+    monkeypatch.setattr(http_cache, 'brotli', None)
+    assert negotiate_encoding(FakeRequest('br, gzip')) == 'gzip'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    items = [Story('n0', 'Earthquake hits Kathmandu', 'Snippet', ['Kathmandu Post'], 0, 'TRUE',
+                   source_url='https://kathmandupost.com/a')]
+    monkeypatch.setattr(app, '_news_index_version', lambda: 'abc-1')
+    monkeypatch.setattr(app, '_get_news_index', lambda: ('abc-1', items))
+    monkeypatch.setattr(app, 'call_groq', lambda claim, evidence, **kw: {'verdict': 'TRUE', 'confidence': 90})
+    return TestClient(app.app)
+
+
+def test_repeat_request_with_etag_gets_304(client):
+    first = client.get('/api/latest_news', headers={'Accept-Encoding': 'identity'})
+    assert first.status_code == 200
+    assert 'max-age' in first.headers['Cache-Control'] and 'Accept-Encoding' in first.headers['Vary']
+    etag = first.headers['ETag']
+
+    for header in (etag, 'W/' + etag, f'"other", {etag}', '*'):
+        again = client.get('/api/latest_news', headers={'Accept-Encoding': 'identity', 'If-None-Match': header})
+        assert again.status_code == 304 and again.headers['ETag'] == etag and again.content == b''
+
+    assert client.get('/api/latest_news', headers={'Accept-Encoding': 'identity',
+                                                   'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_each_content_coding_has_its_own_etag(client):
+    pytest.importorskip('brotli')
+    plain = client.get('/api/latest_news', headers={'Accept-Encoding': 'identity'})
+    gz = client.get('/api/latest_news', headers={'Accept-Encoding': 'gzip'})
+    br = client.get('/api/latest_news', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert gz.headers['Content-Encoding'] == 'gzip'
+    assert br.headers['Content-Encoding'] == 'br'
+    assert plain.json() == gz.json() == br.json()
+    assert len({plain.headers['ETag'], gz.headers['ETag'], br.headers['ETag']}) == 3
+    # A gzip ETag does not validate the brotli representation
+    assert client.get('/api/latest_news', headers={'Accept-Encoding': 'br',
+                                                   'If-None-Match': gz.headers['ETag']}).status_code == 200
+
+
+def test_news_detail_etag_follows_the_body(client, monkeypatch):
+    first = client.get('/api/news/n0')
+    assert first.json()['analysis']['verdict'] == 'TRUE'
+    etag = first.headers['ETag']
+    assert client.get('/api/news/n0', headers={'If-None-Match': etag}).status_code == 304
+
+    monkeypatch.setattr(app, 'call_groq', lambda claim, evidence, **kw: {'verdict': 'FALSE', 'confidence': 80})
+    changed = client.get('/api/news/n0', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+
+
+def test_news_detail_fallback_is_not_cacheable(client, monkeypatch):
+    def groq_down(claim, evidence, **kw):
+        raise LLMUpstreamError('Groq API error: 503')
+
+    monkeypatch.setattr(app, 'call_groq', groq_down)
+    r = client.get('/api/news/n0')
+
+    assert r.status_code == 200
+    assert r.json()['analysis']['verdict'] == 'UNCLEAR'
+    assert r.headers['Cache-Control'] == 'no-store'
+    assert 'ETag' not in r.headers
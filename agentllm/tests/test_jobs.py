@@ -0,0 +1,150 @@
+import os, sys, time, threading
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agent import jobs
+from agent.jobs import JobQueue
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(jobs.time, 'time', c)
+    return c
+
+
+def _run_once(queue, conn):
+    """Claim one job and run it the way a worker thread would; False if none was ready."""
+    row = queue._claim(conn)
+    if row is None:
+        return False
+    attempts = row['attempts'] + 1
+    try:
+        queue._finish(conn, row['id'], attempts, result=queue.handler({}))
+    except Exception as e:
+        queue._finish(conn, row['id'], attempts, error=str(e))
+    return True
+
+
+def test_failed_attempt_is_retried_with_backoff_then_succeeds(tmp_path, clock):
+    calls = []
+
+    def handler(payload):
+        calls.append(clock.now)
+        if len(calls) == 1:
+            raise RuntimeError('upstream down')
+        return {'ok': True}
+
+    queue = JobQueue(handler, path=tmp_path / 'jobs.sqlite', max_attempts=3)
+    job_id = queue.submit({'claim': 'x'})
+    conn = queue._connect()
+
+    assert _run_once(queue, conn)
+    assert queue.get(job_id)['status'] == 'queued'
+    assert queue.get(job_id)['error'] == 'upstream down'
+    assert not _run_once(queue, conn)  # still backing off
+
+    clock.now += 2
+    assert _run_once(queue, conn)
+    job = queue.get(job_id)
+    assert job['status'] == 'done' and job['result'] == {'ok': True} and job['attempts'] == 2
+    conn.close()
+
+
+def test_job_fails_after_max_attempts(tmp_path, clock):
+    def handler(payload):
+        raise RuntimeError('quota exhausted')
+
+    queue = JobQueue(handler, path=tmp_path / 'jobs.sqlite', max_attempts=2)
+    job_id = queue.submit({})
+    conn = queue._connect()
+
+    assert _run_once(queue, conn)
+    clock.now += 60
+    assert _run_once(queue, conn)
+    job = queue.get(job_id)
+    assert job['status'] == 'failed' and job['attempts'] == 2
+    conn.close()
+
+
+def test_running_job_is_reclaimed_after_its_lease_expires(tmp_path, clock):
+    queue = JobQueue(lambda payload: {}, path=tmp_path / 'jobs.sqlite', lease=300)
+    job_id = queue.submit({})
+    conn = queue._connect()
+
+    assert queue._claim(conn)['id'] == job_id  # the worker dies without finishing
+    clock.now += 299
+    assert queue._claim(conn) is None
+    clock.now += 2
+    row = queue._claim(conn)
+    assert row['id'] == job_id and row['attempts'] == 1
+    conn.close()
+
+
+def test_finished_jobs_expire_after_result_ttl(tmp_path, clock):
+    queue = JobQueue(lambda payload: {'ok': True}, path=tmp_path / 'jobs.sqlite', result_ttl=3600)
+    job_id = queue.submit({})
+    conn = queue._connect()
+    assert _run_once(queue, conn)
+
+    clock.now += 3599
+    assert queue.get(job_id)['status'] == 'done'
+    clock.now += 2
+    assert queue.get(job_id) is None
+
+    queue._purge(conn)
+    assert conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 0
+    conn.close()
+
+
+def test_lease_expiry_fails_the_job_once_attempts_are_used_up(tmp_path, clock):
+    queue = JobQueue(lambda payload: {}, path=tmp_path / 'jobs.sqlite', max_attempts=2, lease=300)
+    job_id = queue.submit({})
+    conn = queue._connect()
+
+    assert queue._claim(conn)['id'] == job_id  # attempt 1: the worker process dies
+    clock.now += 301
+    assert queue._claim(conn)['id'] == job_id  # attempt 2: dies again
+    clock.now += 301
+    assert queue._claim(conn) is None
+    job = queue.get(job_id)
+    assert job['status'] == 'failed' and job['attempts'] == 2 and 'Worker lost' in job['error']
+    conn.close()
+
+
+def test_heartbeat_keeps_a_long_running_job_from_being_claimed_twice(tmp_path):
+    started, release = threading.Event(), threading.Event()
+    runs = []
+
+    def handler(payload):
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return {'ok': True}
+
+    queue = JobQueue(handler, path=tmp_path / 'jobs.sqlite', workers=2, lease=0.3, poll_interval=0.05)
+    queue.start()
+    try:
+        job_id = queue.submit({})
+        assert started.wait(5)
+        time.sleep(1.0)  # over three leases
+        conn = queue._connect()
+        assert queue._claim(conn) is None
+        conn.close()
+        release.set()
+        deadline = time.time() + 5
+        while queue.get(job_id)['status'] != 'done' and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        release.set()
+        queue.stop()
+    job = queue.get(job_id)
+    assert job['status'] == 'done' and job['attempts'] == 1 and len(runs) == 1
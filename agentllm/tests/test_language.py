@@ -0,0 +1,51 @@
+import pytest
+
+for mod in ('requests', 'bs4', 'numpy'):
+    pytest.importorskip(mod)
+
+from agent.language import detect_script, route_claim
+
+
+@pytest.mark.parametrize('text, script', [
+    ('काठमाडौंमा भूकम्प गयो', 'ne'),
+    ('Earthquake hits Kathmandu', 'en'),
+    ('काठमाडौंमा भूकम्प गयो, says BBC', 'ne'),   # mostly Devanagari
+    ('Kathmandu earthquake: नेपाल', 'en'),      # mostly Latin
+    ('2081-01-12 7.6', None),
+    ('', None),
+])
+def test_detect_script(text, script):
+    assert detect_script(text) == script
+
+
+def test_nepali_claim_overrides_requested_english_and_skips_the_open_web():
+    lang, route = route_claim('काठमाडौंमा भूकम्प गयो।', 'en')
+    assert lang == 'ne'
+    assert route['general_search'] is False
+    assert 'www.onlinekhabar.com' in route['domains']
+    assert 'kathmandupost.com' not in route['domains']
+    assert route['clean']('काठमाडौंमा   भूकम्प।गयो॥') == 'काठमाडौंमा भूकम्प गयो'
+
+
+def test_english_claim_overrides_the_default_nepali():
+    lang, route = route_claim('Earthquake hits Kathmandu', 'ne')
+    assert lang == 'en'
+    assert route['general_search'] is True
+    assert 'kathmandupost.com' in route['domains'] and 'ekantipur.com' not in route['domains']
+
+
+def test_claim_without_letters_keeps_the_requested_language():
+    assert route_claim('2081-01-12', 'ne')[0] == 'ne'
+    assert route_claim('2081-01-12', 'en')[0] == 'en'
+
+
+def test_unknown_language_uses_the_english_route_with_only_untagged_sources():
+    lang, route = route_claim('2081-01-12', 'hi')
+    assert lang == 'hi'
+    assert route['general_search'] is True
+    assert route['domains'] == set()  # every curated source lists its languages
+
+
+def test_devanagari_in_another_language_is_routed_as_nepali():
+    # Hindi shares the script, and there are no Hindi sources to route it to
+    assert route_claim('दिल्ली में भूकंप आया', 'hi')[0] == 'ne'
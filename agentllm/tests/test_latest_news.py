@@ -0,0 +1,53 @@
+import json
+import pytest
+
+app = pytest.importorskip('app')
+from fastapi import HTTPException
+from agent.news_store import Story
+
+
+class FakeRequest:
+    headers = {}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    state = {'version': 'abc-1'}
+    items = [Story(f'n{i}', f'Title {i}', '', ['Source'], 0, 'TRUE') for i in range(5)]
+    monkeypatch.setattr(app, '_news_index_version', lambda: state['version'])
+    monkeypatch.setattr(app, '_get_news_index', lambda: (state['version'], items))
+    return state
+
+
+def _page(cursor=None):
+    response = app.latest_news(FakeRequest(), limit=2, cursor=cursor)
+    return json.loads(response.body)
+
+
+def test_cursor_pages_through_one_index_version(index):
+    first = _page()
+    assert first['next_cursor'] == 'abc-1.2'
+    second = _page(first['next_cursor'])
+    assert [n['id'] for n in second['news']] == ['n2', 'n3']
+
+
+def test_stale_cursor_is_rejected_after_the_index_changes(index):
+    cursor = _page()['next_cursor']
+    index['version'] = 'abc-2'  # the hour rolled over
+    with pytest.raises(HTTPException) as exc:
+        _page(cursor)
+    assert exc.value.status_code == 409
+
+
+def test_bare_offset_cursor_is_invalid(index):
+    with pytest.raises(HTTPException) as exc:
+        _page('2')
+    assert exc.value.status_code == 400
+
+
+def test_index_clock_is_the_wall_clock_hour_not_the_cache_mtime(tmp_path):
+    version = app._news_index_version(tmp_path, now=7200.5)
+    stamp, _, hour = version.partition('-')
+    assert int(hour, 16) == 2
+    assert app._news_index_version(tmp_path, now=10799) == version
+    assert app._news_index_version(tmp_path, now=10800) != version
@@ -0,0 +1,51 @@
+import pytest
+
+app = pytest.importorskip('app')
+from fastapi.testclient import TestClient
+from agent import profiling
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(profiling, 'ADMIN_TOKEN', 'secret')
+    monkeypatch.setattr(app, 'quota_status', lambda: {'used': 0})
+    return TestClient(app.app)
+
+
+@pytest.mark.parametrize('headers', [
+    {},
+    {'X-Admin-Token': 'wrong'},
+    {'X-Admin-Token': 'café'.encode('utf-8')},
+])
+def test_admin_endpoints_reject_missing_wrong_and_non_ascii_tokens(client, headers):
+    assert client.get('/api/admin/tracemalloc', headers=headers).status_code == 403
+
+
+def test_admin_endpoints_are_closed_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(profiling, 'ADMIN_TOKEN', '')
+    assert client.get('/api/admin/tracemalloc', headers={'X-Admin-Token': ''}).status_code == 403
+
+
+def test_non_ascii_admin_token_matches_the_bytes_sent(client, monkeypatch):
+    monkeypatch.setattr(profiling, 'ADMIN_TOKEN', 'café')
+    r = client.get('/api/search/quota', headers={'X-Admin-Token': 'café'.encode('utf-8'), 'X-Profile': 'cprofile'})
+    assert r.headers['X-Profiled-Status'] == '200'
+
+
+def test_admin_profile_request_returns_the_report(client):
+    r = client.get('/api/search/quota', headers={'X-Admin-Token': 'secret', 'X-Profile': 'cprofile'})
+    assert r.status_code == 200
+    assert r.headers['X-Profiled-Status'] == '200'
+    assert 'function calls' in r.text and 'search_quota' in r.text
+
+
+@pytest.mark.parametrize('headers', [
+    {'X-Admin-Token': 'secret'},
+    {'X-Profile': 'cprofile'},
+    {'X-Profile': 'cprofile', 'X-Admin-Token': 'café'.encode('utf-8')},
+])
+def test_unprofiled_requests_are_left_alone(client, headers):
+    r = client.get('/api/search/quota', headers=headers)
+    assert r.status_code == 200
+    assert r.json() == {'used': 0}
+    assert 'X-Profiled-Status' not in r.headers
@@ -0,0 +1,67 @@
+import os, sys
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+for mod in ('requests', 'bs4', 'numpy'):
+    pytest.importorskip(mod)
+
+from agent import search
+from agent.search import cached_search, quota_status, QuotaExceeded
+
+
+@pytest.fixture
+def cse(tmp_path, monkeypatch):
+    """Fresh cache database, a fake clock and a counting google_search stub."""
+    calls = []
+    clock = {'now': 1_700_000_000.0}
+    monkeypatch.setattr(search, 'SEARCH_DB_PATH', tmp_path / 'search.sqlite')
+    monkeypatch.setattr(search, '_initialized', False)
+    monkeypatch.setattr(search.time, 'time', lambda: clock['now'])
+
+    def fake_google_search(query, num=8):
+        calls.append(query)
+        return [{'link': f'https://kathmandupost.com/{len(calls)}', 'title': query, 'snippet': ''}]
+
+    monkeypatch.setattr(search, 'google_search', fake_google_search)
+    return calls, clock
+
+
+def test_normalized_repeat_is_served_from_cache(cse):
+    calls, clock = cse
+    first = cached_search('Earthquake  in Kathmandu', num=5)
+    clock['now'] += search.SEARCH_CACHE_TTL - 1
+
+    assert cached_search('earthquake in kathmandu', num=5) == first
+    assert len(calls) == 1
+    assert quota_status()['used'] == 1
+
+
+def test_expired_entry_is_refetched(cse):
+    calls, clock = cse
+    cached_search('Earthquake in Kathmandu', num=5)
+    clock['now'] += search.SEARCH_CACHE_TTL + 1
+
+    cached_search('Earthquake in Kathmandu', num=5)
+    assert len(calls) == 2
+
+
+def test_quota_is_reserved_per_call_and_enforced(cse, monkeypatch):
+    calls, clock = cse
+    monkeypatch.setattr(search, 'CSE_DAILY_QUOTA', 2)
+    cached_search('first claim')
+    cached_search('second claim')
+
+    with pytest.raises(QuotaExceeded):
+        cached_search('third claim')
+    assert len(calls) == 2
+    assert quota_status() == {'day': search._quota_day(), 'used': 2, 'limit': 2, 'remaining': 0}
+    # Cached queries are still answered once the budget is spent
+    assert cached_search('first claim')[0]['title'] == 'first claim'
+
+
+def test_missing_database_directory_is_created(cse, tmp_path, monkeypatch):
+    path = tmp_path / 'new' / 'nested' / 'search.sqlite'
+    monkeypatch.setattr(search, 'SEARCH_DB_PATH', path)
+
+    assert quota_status()['used'] == 0
+    assert path.exists()
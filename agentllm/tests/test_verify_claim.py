@@ -0,0 +1,81 @@
+import pytest
+
+app = pytest.importorskip('app')
+from agent.search import QuotaExceeded
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Stub the upstream calls; returns (queries run, results per query label)."""
+    queries, results = [], {}
+
+    def fake_search(query, num=8):
+        queries.append(query)
+        return results.get('whitelisted' if 'site:' in query else 'general', [])[:num]
+
+    monkeypatch.setattr(app, 'cached_search', fake_search)
+    monkeypatch.setattr(app, 'fetch_page_text', lambda url: 'Evidence text. ' * 20)
+    monkeypatch.setattr(app, 'call_groq', lambda claim, evidence, lang='ne', **kw: {'verdict': 'TRUE', 'confidence': 90})
+    monkeypatch.setattr(app, 'quota_status', lambda: {'used': 0})
+    return queries, results
+
+
+def _hits(domain, n):
+    return [{'link': f'https://{domain}/story-{i}', 'title': f'Story {i}', 'snippet': ''} for i in range(n)]
+
+
+def test_general_query_skipped_once_whitelisted_query_has_enough_evidence(pipeline):
+    queries, results = pipeline
+    results['whitelisted'] = _hits('kathmandupost.com', app.SEARCH_RESULTS_PER_QUERY)
+    results['general'] = _hits('thehimalayantimes.com', 5)
+
+    analysis = app._verify_claim('Earthquake hits Kathmandu valley', 'en')
+
+    assert len(queries) == 1 and 'site:' in queries[0]
+    assert len(analysis['evidence']) >= app.ENOUGH_EVIDENCE_ITEMS
+
+
+def test_general_query_runs_when_whitelisted_query_falls_short(pipeline):
+    queries, results = pipeline
+    results['whitelisted'] = _hits('kathmandupost.com', app.ENOUGH_EVIDENCE_ITEMS - 1)
+    results['general'] = _hits('thehimalayantimes.com', 5)
+
+    app._verify_claim('Earthquake hits Kathmandu valley', 'en')
+
+    assert len(queries) == 2 and 'site:' not in queries[1]
+
+
+def test_enough_evidence_threshold_is_reachable_by_one_query():
+    assert app.ENOUGH_EVIDENCE_ITEMS <= app.SEARCH_RESULTS_PER_QUERY
+
+
+def test_strict_verification_raises_on_upstream_failure(pipeline, monkeypatch):
+    def quota_exceeded(query, num=8):
+        raise QuotaExceeded('Daily CSE quota of 100 queries used up')
+
+    monkeypatch.setattr(app, 'cached_search', quota_exceeded)
+
+    assert app._verify_claim('Earthquake hits Kathmandu valley', 'en')['verdict'] == 'TRUE'
+    with pytest.raises(QuotaExceeded):
+        app._verify_claim('Earthquake hits Kathmandu valley', 'en', strict=True)
+
+
+def test_nepali_claim_searches_nepali_sources_only_and_prompts_in_nepali(pipeline, monkeypatch):
+    queries, results = pipeline
+    prompts = []
+    monkeypatch.setattr(app, 'call_groq', lambda claim, evidence, lang='ne', **kw: prompts.append(lang) or {'verdict': 'TRUE'})
+
+    app._verify_claim('काठमाडौंमा भूकम्प गयो', 'en')
+
+    assert len(queries) == 1  # no open-web fallback, even with no evidence
+    assert 'site:ekantipur.com' in queries[0] and 'site:kathmandupost.com' not in queries[0]
+    assert prompts == ['ne']
+
+
+def test_search_falls_back_to_allowed_domains_without_overlap(pipeline, monkeypatch):
+    queries, results = pipeline
+    monkeypatch.setattr(app, 'ALLOWED_DOMAINS', {'example.org'})
+
+    app._verify_claim('Earthquake hits Kathmandu valley', 'en')
+
+    assert queries[0].endswith('(site:example.org)')
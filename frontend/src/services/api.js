@@ -16,9 +16,7 @@ export const verifyClaimAPI = async (claim, lang = "ne") => {
 };
 
 export const getLatestNews = async (limit = 15) => {
-  const response = await fetch(
-    `${API_BASE_URL}/api/latest_news?limit=${limit}&_t=${Date.now()}`
-  );
+  const response = await fetch(`${API_BASE_URL}/api/latest_news?limit=${limit}`);
 
   if (!response.ok) {
     throw new Error(`HTTP error! status: ${response.status}`);